@@ -0,0 +1,60 @@
+"""Store saved item data as JSON
+
+Revision ID: 5b1d9e7f2a4c
+Revises: c0e4c4b735f7
+Create Date: 2026-10-19 10:12:04.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1d9e7f2a4c'
+down_revision: Union[str, None] = 'c0e4c4b735f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # c0e4c4b735f7 was generated empty, so databases built only from
+    # migrations may not have the table yet.
+    if 'saved_items' not in sa.inspect(bind).get_table_names():
+        op.create_table('saved_items',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('item_id', sa.String(), nullable=False),
+        sa.Column('item_type', sa.String(), nullable=False),
+        sa.Column('item_title', sa.String(), nullable=False),
+        sa.Column('item_data', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_saved_items_id'), 'saved_items', ['id'], unique=False)
+        op.create_index(op.f('ix_saved_items_user_id'), 'saved_items', ['user_id'], unique=False)
+        op.create_index(op.f('ix_saved_items_item_id'), 'saved_items', ['item_id'], unique=False)
+        op.create_index(op.f('ix_saved_items_item_type'), 'saved_items', ['item_type'], unique=False)
+        return
+
+    # SQLite stores JSON as text already; only Postgres needs a conversion.
+    if bind.dialect.name == 'postgresql':
+        op.alter_column('saved_items', 'item_data',
+                   existing_type=sa.Text(),
+                   type_=postgresql.JSONB(),
+                   existing_nullable=False,
+                   postgresql_using='item_data::jsonb')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('saved_items', 'item_data',
+                   existing_type=postgresql.JSONB(),
+                   type_=sa.Text(),
+                   existing_nullable=False,
+                   postgresql_using='item_data::text')
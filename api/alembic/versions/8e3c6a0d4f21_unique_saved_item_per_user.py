@@ -0,0 +1,35 @@
+"""Unique saved item per user
+
+Revision ID: 8e3c6a0d4f21
+Revises: 5b1d9e7f2a4c
+Create Date: 2026-10-19 10:41:37.502114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3c6a0d4f21'
+down_revision: Union[str, None] = '5b1d9e7f2a4c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicates left behind by the old check-then-insert save path
+    op.execute(
+        """
+        DELETE FROM saved_items
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM saved_items GROUP BY user_id, item_type, item_id
+        )
+        """
+    )
+    op.create_index('uq_saved_items_user_item', 'saved_items', ['user_id', 'item_type', 'item_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_saved_items_user_item', table_name='saved_items')
@@ -0,0 +1,291 @@
+"""Add full-text search index
+
+Revision ID: a6c94e0b17f3
+Revises: f3a81c27d5b9
+Create Date: 2026-10-19 12:47:02.619380
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c94e0b17f3'
+down_revision: Union[str, None] = 'f3a81c27d5b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The DDL is spelled out here rather than imported from app.core.search_index,
+# so this revision keeps creating the same schema as the app's copy evolves.
+_SAVED_INSERT = """
+    INSERT INTO search_index
+        (owner, title, author, description, source, item_type, ref_id, parent_id)
+    SELECT replace(NEW.user_id, '-', ''), NEW.item_title,
+           json_extract(c.data, '$.author'), json_extract(c.data, '$.description'),
+           'saved_item', NEW.item_type, NEW.id, NEW.item_id
+    FROM catalog_items c WHERE c.id = NEW.catalog_item_id;
+"""
+
+_SAVED_DELETE = """
+    DELETE FROM search_index WHERE rowid IN (
+        SELECT rowid FROM search_index
+        WHERE search_index MATCH 'owner:"' || replace(OLD.user_id, '-', '') || '"'
+          AND ref_id = OLD.id
+    );
+"""
+
+_MOVIE_INSERT = """
+    INSERT INTO search_index
+        (owner, title, author, description, source, item_type, ref_id, parent_id)
+    SELECT replace(r.user_id, '-', ''), NEW.title, NULL, NEW.description,
+           'recommendation', 'movie', NEW.id, NEW.recommendation_id
+    FROM recommendations r WHERE r.id = NEW.recommendation_id;
+"""
+
+_BOOK_INSERT = """
+    INSERT INTO search_index
+        (owner, title, author, description, source, item_type, ref_id, parent_id)
+    SELECT replace(r.user_id, '-', ''), NEW.title, NEW.author, NEW.description,
+           'recommendation', 'book', NEW.id, NEW.recommendation_id
+    FROM recommendations r WHERE r.id = NEW.recommendation_id;
+"""
+
+_RECOMMENDATION_DELETE = """
+    DELETE FROM search_index WHERE rowid IN (
+        SELECT rowid FROM search_index
+        WHERE search_index MATCH 'owner:"' || (
+            SELECT replace(user_id, '-', '') FROM recommendations
+            WHERE id = OLD.recommendation_id
+        ) || '"'
+          AND ref_id = OLD.id
+    );
+"""
+
+SQLITE_UPGRADE = [
+    """
+    CREATE VIRTUAL TABLE search_index USING fts5(
+        owner, title, author, description,
+        source UNINDEXED, item_type UNINDEXED, ref_id UNINDEXED, parent_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"CREATE TRIGGER search_saved_items_insert "
+    f"AFTER INSERT ON saved_items BEGIN {_SAVED_INSERT} END",
+    f"CREATE TRIGGER search_saved_items_update "
+    f"AFTER UPDATE OF item_title, catalog_item_id ON saved_items "
+    f"BEGIN {_SAVED_DELETE} {_SAVED_INSERT} END",
+    f"CREATE TRIGGER search_saved_items_delete "
+    f"AFTER DELETE ON saved_items BEGIN {_SAVED_DELETE} END",
+    """
+    CREATE TRIGGER search_catalog_items_update
+    AFTER UPDATE OF data ON catalog_items
+    WHEN EXISTS (SELECT 1 FROM saved_items WHERE catalog_item_id = NEW.id) BEGIN
+        DELETE FROM search_index WHERE rowid IN (
+            SELECT rowid FROM search_index
+            WHERE search_index MATCH 'owner:(' || (
+                SELECT group_concat('"' || replace(user_id, '-', '') || '"', ' OR ')
+                FROM saved_items WHERE catalog_item_id = NEW.id
+            ) || ')'
+              AND ref_id IN (SELECT id FROM saved_items WHERE catalog_item_id = NEW.id)
+        );
+        INSERT INTO search_index
+            (owner, title, author, description, source, item_type, ref_id, parent_id)
+        SELECT replace(s.user_id, '-', ''), s.item_title,
+               json_extract(NEW.data, '$.author'), json_extract(NEW.data, '$.description'),
+               'saved_item', s.item_type, s.id, s.item_id
+        FROM saved_items s WHERE s.catalog_item_id = NEW.id;
+    END
+    """,
+    f"CREATE TRIGGER search_movie_recommendations_insert "
+    f"AFTER INSERT ON movie_recommendations BEGIN {_MOVIE_INSERT} END",
+    f"CREATE TRIGGER search_movie_recommendations_update "
+    f"AFTER UPDATE OF title, description ON movie_recommendations "
+    f"BEGIN {_RECOMMENDATION_DELETE} {_MOVIE_INSERT} END",
+    f"CREATE TRIGGER search_movie_recommendations_delete "
+    f"AFTER DELETE ON movie_recommendations BEGIN {_RECOMMENDATION_DELETE} END",
+    f"CREATE TRIGGER search_book_recommendations_insert "
+    f"AFTER INSERT ON book_recommendations BEGIN {_BOOK_INSERT} END",
+    f"CREATE TRIGGER search_book_recommendations_update "
+    f"AFTER UPDATE OF title, description ON book_recommendations "
+    f"BEGIN {_RECOMMENDATION_DELETE} {_BOOK_INSERT} END",
+    f"CREATE TRIGGER search_book_recommendations_delete "
+    f"AFTER DELETE ON book_recommendations BEGIN {_RECOMMENDATION_DELETE} END",
+    # Fill the index from existing rows
+    """
+    INSERT INTO search_index
+        (owner, title, author, description, source, item_type, ref_id, parent_id)
+    SELECT replace(s.user_id, '-', ''), s.item_title,
+           json_extract(c.data, '$.author'), json_extract(c.data, '$.description'),
+           'saved_item', s.item_type, s.id, s.item_id
+    FROM saved_items s JOIN catalog_items c ON c.id = s.catalog_item_id
+    """,
+    """
+    INSERT INTO search_index
+        (owner, title, author, description, source, item_type, ref_id, parent_id)
+    SELECT replace(r.user_id, '-', ''), m.title, NULL, m.description,
+           'recommendation', 'movie', m.id, m.recommendation_id
+    FROM movie_recommendations m JOIN recommendations r ON r.id = m.recommendation_id
+    """,
+    """
+    INSERT INTO search_index
+        (owner, title, author, description, source, item_type, ref_id, parent_id)
+    SELECT replace(r.user_id, '-', ''), b.title, b.author, b.description,
+           'recommendation', 'book', b.id, b.recommendation_id
+    FROM book_recommendations b JOIN recommendations r ON r.id = b.recommendation_id
+    """,
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS search_saved_items_insert",
+    "DROP TRIGGER IF EXISTS search_saved_items_update",
+    "DROP TRIGGER IF EXISTS search_saved_items_delete",
+    "DROP TRIGGER IF EXISTS search_catalog_items_update",
+    "DROP TRIGGER IF EXISTS search_movie_recommendations_insert",
+    "DROP TRIGGER IF EXISTS search_movie_recommendations_update",
+    "DROP TRIGGER IF EXISTS search_movie_recommendations_delete",
+    "DROP TRIGGER IF EXISTS search_book_recommendations_insert",
+    "DROP TRIGGER IF EXISTS search_book_recommendations_update",
+    "DROP TRIGGER IF EXISTS search_book_recommendations_delete",
+    "DROP TABLE IF EXISTS search_index",
+]
+
+POSTGRES_UPGRADE = [
+    """
+    CREATE TABLE search_documents (
+        source VARCHAR NOT NULL,
+        ref_id VARCHAR(36) NOT NULL,
+        user_id VARCHAR(36) NOT NULL,
+        item_type VARCHAR NOT NULL,
+        parent_id VARCHAR,
+        title VARCHAR NOT NULL,
+        author VARCHAR,
+        description TEXT,
+        document TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(author, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        ) STORED,
+        PRIMARY KEY (source, ref_id)
+    )
+    """,
+    "CREATE INDEX ix_search_documents_document "
+    "ON search_documents USING gin (document)",
+    "CREATE INDEX ix_search_documents_user_id "
+    "ON search_documents (user_id)",
+    """
+    CREATE OR REPLACE FUNCTION search_index_saved_item() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_documents WHERE source = 'saved_item' AND ref_id = OLD.id;
+            RETURN OLD;
+        END IF;
+        INSERT INTO search_documents
+            (source, ref_id, user_id, item_type, parent_id, title, author, description)
+        SELECT 'saved_item', NEW.id, NEW.user_id, NEW.item_type, NEW.item_id,
+               NEW.item_title, c.data->>'author', c.data->>'description'
+        FROM catalog_items c WHERE c.id = NEW.catalog_item_id
+        ON CONFLICT (source, ref_id) DO UPDATE SET
+            title = EXCLUDED.title,
+            author = EXCLUDED.author,
+            description = EXCLUDED.description;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_index_recommendation_item() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM search_documents WHERE source = 'recommendation' AND ref_id = OLD.id;
+            RETURN OLD;
+        END IF;
+        INSERT INTO search_documents
+            (source, ref_id, user_id, item_type, parent_id, title, author, description)
+        SELECT 'recommendation', NEW.id, r.user_id, TG_ARGV[0], NEW.recommendation_id,
+               NEW.title, to_jsonb(NEW)->>'author', NEW.description
+        FROM recommendations r WHERE r.id = NEW.recommendation_id
+        ON CONFLICT (source, ref_id) DO UPDATE SET
+            title = EXCLUDED.title,
+            author = EXCLUDED.author,
+            description = EXCLUDED.description;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_index_catalog_item() RETURNS trigger AS $$
+    BEGIN
+        UPDATE search_documents d SET
+            author = NEW.data->>'author',
+            description = NEW.data->>'description'
+        FROM saved_items s
+        WHERE s.catalog_item_id = NEW.id
+          AND d.source = 'saved_item' AND d.ref_id = s.id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "CREATE TRIGGER search_index_saved_items "
+    "AFTER INSERT OR UPDATE OR DELETE ON saved_items "
+    "FOR EACH ROW EXECUTE FUNCTION search_index_saved_item()",
+    "CREATE TRIGGER search_index_movie_recommendations "
+    "AFTER INSERT OR UPDATE OR DELETE ON movie_recommendations "
+    "FOR EACH ROW EXECUTE FUNCTION search_index_recommendation_item('movie')",
+    "CREATE TRIGGER search_index_book_recommendations "
+    "AFTER INSERT OR UPDATE OR DELETE ON book_recommendations "
+    "FOR EACH ROW EXECUTE FUNCTION search_index_recommendation_item('book')",
+    "CREATE TRIGGER search_index_catalog_items "
+    "AFTER UPDATE OF data ON catalog_items "
+    "FOR EACH ROW WHEN (OLD.data IS DISTINCT FROM NEW.data) "
+    "EXECUTE FUNCTION search_index_catalog_item()",
+    # Fill the index from existing rows
+    """
+    INSERT INTO search_documents
+        (source, ref_id, user_id, item_type, parent_id, title, author, description)
+    SELECT 'saved_item', s.id, s.user_id, s.item_type, s.item_id,
+           s.item_title, c.data->>'author', c.data->>'description'
+    FROM saved_items s JOIN catalog_items c ON c.id = s.catalog_item_id
+    """,
+    """
+    INSERT INTO search_documents
+        (source, ref_id, user_id, item_type, parent_id, title, author, description)
+    SELECT 'recommendation', m.id, r.user_id, 'movie', m.recommendation_id,
+           m.title, NULL, m.description
+    FROM movie_recommendations m JOIN recommendations r ON r.id = m.recommendation_id
+    """,
+    """
+    INSERT INTO search_documents
+        (source, ref_id, user_id, item_type, parent_id, title, author, description)
+    SELECT 'recommendation', b.id, r.user_id, 'book', b.recommendation_id,
+           b.title, b.author, b.description
+    FROM book_recommendations b JOIN recommendations r ON r.id = b.recommendation_id
+    """,
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS search_index_saved_items ON saved_items",
+    "DROP TRIGGER IF EXISTS search_index_movie_recommendations ON movie_recommendations",
+    "DROP TRIGGER IF EXISTS search_index_book_recommendations ON book_recommendations",
+    "DROP TRIGGER IF EXISTS search_index_catalog_items ON catalog_items",
+    "DROP FUNCTION IF EXISTS search_index_saved_item()",
+    "DROP FUNCTION IF EXISTS search_index_catalog_item()",
+    "DROP FUNCTION IF EXISTS search_index_recommendation_item()",
+    "DROP TABLE IF EXISTS search_documents",
+]
+
+
+def upgrade() -> None:
+    # FTS5 table on SQLite, tsvector table on Postgres; both kept current by triggers
+    bind = op.get_bind()
+    statements = SQLITE_UPGRADE if bind.dialect.name == "sqlite" else POSTGRES_UPGRADE
+    for statement in statements:
+        bind.exec_driver_sql(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    statements = SQLITE_DOWNGRADE if bind.dialect.name == "sqlite" else POSTGRES_DOWNGRADE
+    for statement in statements:
+        bind.exec_driver_sql(statement)
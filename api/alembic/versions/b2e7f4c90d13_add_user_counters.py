@@ -0,0 +1,47 @@
+"""Add user counters
+
+Revision ID: b2e7f4c90d13
+Revises: a6c94e0b17f3
+Create Date: 2026-10-19 13:21:45.830117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e7f4c90d13'
+down_revision: Union[str, None] = 'a6c94e0b17f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_counters',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'name')
+    )
+
+    # Seed from the existing rows
+    op.execute(
+        """
+        INSERT INTO user_counters (user_id, name, value)
+        SELECT user_id, 'saved_items', COUNT(*) FROM saved_items GROUP BY user_id
+        UNION ALL
+        SELECT user_id, 'saved_items.' || item_type, COUNT(*) FROM saved_items GROUP BY user_id, item_type
+        UNION ALL
+        SELECT user_id, 'recommendations', COUNT(*) FROM recommendations GROUP BY user_id
+        UNION ALL
+        SELECT user_id, 'sync_version', MAX(version) FROM user_changes GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_counters')
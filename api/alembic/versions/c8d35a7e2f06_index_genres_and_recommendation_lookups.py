@@ -0,0 +1,34 @@
+"""Index genres and recommendation lookups
+
+Revision ID: c8d35a7e2f06
+Revises: b2e7f4c90d13
+Create Date: 2026-10-19 13:58:26.147702
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d35a7e2f06'
+down_revision: Union[str, None] = 'b2e7f4c90d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_movie_genres_genre'), 'movie_genres', ['genre'], unique=False)
+    op.create_index(op.f('ix_book_genres_genre'), 'book_genres', ['genre'], unique=False)
+    op.create_index(op.f('ix_movie_recommendations_recommendation_id'), 'movie_recommendations', ['recommendation_id'], unique=False)
+    op.create_index(op.f('ix_book_recommendations_recommendation_id'), 'book_recommendations', ['recommendation_id'], unique=False)
+    op.create_index(op.f('ix_recommendations_user_id'), 'recommendations', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recommendations_user_id'), table_name='recommendations')
+    op.drop_index(op.f('ix_book_recommendations_recommendation_id'), table_name='book_recommendations')
+    op.drop_index(op.f('ix_movie_recommendations_recommendation_id'), table_name='movie_recommendations')
+    op.drop_index(op.f('ix_book_genres_genre'), table_name='book_genres')
+    op.drop_index(op.f('ix_movie_genres_genre'), table_name='movie_genres')
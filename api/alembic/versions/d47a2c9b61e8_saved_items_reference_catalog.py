@@ -0,0 +1,126 @@
+"""Saved items reference shared catalog entries
+
+Revision ID: d47a2c9b61e8
+Revises: 8e3c6a0d4f21
+Create Date: 2026-10-19 11:26:53.904417
+
+"""
+from typing import Sequence, Union
+import json
+import re
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd47a2c9b61e8'
+down_revision: Union[str, None] = '8e3c6a0d4f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+
+def _normalize(value):
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+
+def _catalog_key(item_type, title, data):
+    # Mirrors app.crud.catalog.catalog_key at the time of this revision
+    if item_type == 'movie':
+        year = str(data.get('release_date') or data.get('year') or '')[:4]
+        return f"{_normalize(title)}|{year}"
+    return f"{_normalize(title)}|{_normalize(data.get('author'))}"
+
+
+def upgrade() -> None:
+    op.create_table('catalog_items',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('item_type', sa.String(), nullable=False),
+    sa.Column('catalog_key', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('data', JSON_TYPE, nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_catalog_items_id'), 'catalog_items', ['id'], unique=False)
+    op.create_index('uq_catalog_items_type_key', 'catalog_items', ['item_type', 'catalog_key'], unique=True)
+    op.add_column('saved_items', sa.Column('catalog_item_id', sa.String(length=36), nullable=True))
+
+    # Deduplicate payloads: the most recently saved copy of each title
+    # becomes its catalog entry.
+    bind = op.get_bind()
+    saved_items = sa.table('saved_items',
+        sa.column('id', sa.String), sa.column('item_type', sa.String),
+        sa.column('item_title', sa.String), sa.column('item_data', JSON_TYPE),
+        sa.column('created_at', sa.DateTime), sa.column('catalog_item_id', sa.String),
+    )
+    catalog_items = sa.table('catalog_items',
+        sa.column('id', sa.String), sa.column('item_type', sa.String),
+        sa.column('catalog_key', sa.String), sa.column('title', sa.String),
+        sa.column('data', JSON_TYPE),
+    )
+
+    catalog_ids = {}
+    rows = bind.execute(
+        sa.select(saved_items.c.id, saved_items.c.item_type, saved_items.c.item_title, saved_items.c.item_data)
+        .order_by(saved_items.c.created_at.desc())
+    )
+    for saved_id, item_type, title, data in rows.all():
+        if isinstance(data, str):
+            data = json.loads(data)
+        data = {k: v for k, v in (data or {}).items() if k != 'id'}
+        key = (item_type, _catalog_key(item_type, title, data))
+        if key not in catalog_ids:
+            catalog_ids[key] = str(uuid.uuid4())
+            bind.execute(catalog_items.insert().values(
+                id=catalog_ids[key], item_type=item_type, catalog_key=key[1], title=title, data=data,
+            ))
+        bind.execute(
+            saved_items.update()
+            .where(saved_items.c.id == saved_id)
+            .values(catalog_item_id=catalog_ids[key])
+        )
+
+    with op.batch_alter_table('saved_items') as batch_op:
+        batch_op.alter_column('catalog_item_id', existing_type=sa.String(length=36), nullable=False)
+        batch_op.create_foreign_key('fk_saved_items_catalog_item_id', 'catalog_items', ['catalog_item_id'], ['id'])
+        batch_op.create_index(op.f('ix_saved_items_catalog_item_id'), ['catalog_item_id'], unique=False)
+        batch_op.drop_column('item_data')
+
+
+def downgrade() -> None:
+    op.add_column('saved_items', sa.Column('item_data', JSON_TYPE, nullable=True))
+
+    bind = op.get_bind()
+    saved_items = sa.table('saved_items',
+        sa.column('id', sa.String), sa.column('item_id', sa.String),
+        sa.column('item_data', JSON_TYPE), sa.column('catalog_item_id', sa.String),
+    )
+    catalog_items = sa.table('catalog_items', sa.column('id', sa.String), sa.column('data', JSON_TYPE))
+    rows = bind.execute(
+        sa.select(saved_items.c.id, saved_items.c.item_id, catalog_items.c.data)
+        .join(catalog_items, catalog_items.c.id == saved_items.c.catalog_item_id)
+    )
+    for saved_id, item_id, data in rows.all():
+        if isinstance(data, str):
+            data = json.loads(data)
+        bind.execute(
+            saved_items.update()
+            .where(saved_items.c.id == saved_id)
+            .values(item_data={'id': item_id, **data})
+        )
+
+    with op.batch_alter_table('saved_items') as batch_op:
+        batch_op.alter_column('item_data', existing_type=JSON_TYPE, nullable=False)
+        batch_op.drop_index(op.f('ix_saved_items_catalog_item_id'))
+        batch_op.drop_constraint('fk_saved_items_catalog_item_id', type_='foreignkey')
+        batch_op.drop_column('catalog_item_id')
+
+    op.drop_index('uq_catalog_items_type_key', table_name='catalog_items')
+    op.drop_index(op.f('ix_catalog_items_id'), table_name='catalog_items')
+    op.drop_table('catalog_items')
@@ -0,0 +1,56 @@
+"""Add user change log for delta sync
+
+Revision ID: f3a81c27d5b9
+Revises: d47a2c9b61e8
+Create Date: 2026-10-19 12:08:14.271935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a81c27d5b9'
+down_revision: Union[str, None] = 'd47a2c9b61e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_changes',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('version', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.String(), nullable=False),
+    sa.Column('op', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_changes_user_version', 'user_changes', ['user_id', 'version'], unique=False)
+
+    # Seed the log with existing data so a sync from version 0 is complete,
+    # numbering each user's changes in creation order
+    op.execute(
+        """
+        INSERT INTO user_changes (user_id, version, entity, entity_id, op, created_at)
+        SELECT user_id,
+               ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at, entity, entity_id),
+               entity, entity_id, 'upsert', created_at
+        FROM (
+            SELECT user_id, 'recommendation' AS entity, id AS entity_id, created_at
+            FROM recommendations
+            UNION ALL
+            SELECT user_id, 'saved_item', item_type || ':' || item_id, created_at
+            FROM saved_items
+        ) AS existing
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_changes_user_version', table_name='user_changes')
+    op.drop_table('user_changes')
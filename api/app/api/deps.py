@@ -2,7 +2,7 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.database import get_db, request_user_id
 from app.core.security import verify_token
 from app.crud.user import user_crud
 from app.models.user import User
@@ -39,6 +39,7 @@ async def get_current_user(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
 
+    request_user_id.set(user.id)
     return user
 
 
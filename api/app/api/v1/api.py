@@ -6,6 +6,8 @@ from app.api.v1.endpoints import (
     recommendations,
     subscriptions,
     saved_items,
+    sync,
+    search,
 )
 
 api_router = APIRouter()
@@ -26,4 +28,6 @@ api_router.include_router(
     saved_items.router, 
     prefix="/users", 
     tags=["saved-items"]
-)
\ No newline at end of file
+)
+api_router.include_router(sync.router, prefix="/users", tags=["sync"])
+api_router.include_router(search.router, prefix="/users", tags=["search"])
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.api.deps import get_current_active_user
 from app.crud.preferences import preferences_crud
 from app.models.user import User
@@ -11,7 +11,7 @@ router = APIRouter()
 
 @router.get("/", response_model=UserPreferencesResponse)
 async def get_user_preferences(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get user preferences."""
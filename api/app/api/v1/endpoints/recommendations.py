@@ -1,14 +1,18 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.deadline import Deadline, DeadlineExceeded
 from app.api.deps import get_current_active_user
 from app.models.user import User
 from app.models.recommendation import Recommendation
 from app.models.subscription import Subscription
+from app.crud.counter import user_counter_crud, RECOMMENDATIONS
+from app.crud.genre import normalize_genre
 from app.crud.recommendation import recommendation_crud
+from app.services.admission import AdmissionRejected
 from app.services.recommendation_service import recommendation_service
 from app.schemas.recommendation import (
     QuestionGenerationRequest,
@@ -38,7 +42,7 @@ async def get_user_subscription_tier(db: AsyncSession, user_id: str) -> str:
 
 @router.get("/limits")
 async def get_recommendation_limits(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get user's recommendation limits based on subscription."""
@@ -100,6 +104,8 @@ async def generate_questions(
             user=current_user,
             recommendation_type=request.type,
             num_questions=request.num_questions,
+            deadline=Deadline.for_tier(user_tier),
+            tier=user_tier,
         )
 
         questions = [
@@ -114,6 +120,17 @@ async def generate_questions(
             "question_count": len(questions),
         }
 
+    except DeadlineExceeded:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Generating questions took too long, please try again",
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="We're handling a lot of requests right now, please try again shortly",
+            headers={"Retry-After": str(int(e.retry_after))},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -167,9 +184,15 @@ async def submit_answers(
             detail=f"Answer validation failed: {'; '.join(error_parts)}",
         )
 
+    user_tier = await get_user_subscription_tier(db, current_user.id)
+
     try:
         updated_recommendation = await recommendation_service.process_answers(
-            db=db, recommendation=recommendation, answers=submission.answers
+            db=db,
+            recommendation=recommendation,
+            answers=submission.answers,
+            deadline=Deadline.for_tier(user_tier),
+            tier=user_tier,
         )
 
         questions = [
@@ -189,7 +212,7 @@ async def submit_answers(
                 poster_path=movie.poster_path,
                 release_date=movie.release_date,
                 runtime=movie.runtime,
-                genres=[],  # TODO: Implement genre relationships
+                genres=[genre.name for genre in movie.genres],
             )
             for movie in updated_recommendation.movie_recommendations or []
         ]
@@ -206,7 +229,7 @@ async def submit_answers(
                 published_date=book.published_date,
                 page_count=book.page_count,
                 publisher=book.publisher,
-                genres=[],  # TODO: Implement genre relationships
+                genres=[genre.name for genre in book.genres],
             )
             for book in updated_recommendation.book_recommendations or []
         ]
@@ -220,6 +243,17 @@ async def submit_answers(
             books=books,
         )
 
+    except DeadlineExceeded:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Generating recommendations took too long, please try again",
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="We're handling a lot of requests right now, please try again shortly",
+            headers={"Retry-After": str(int(e.retry_after))},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -231,38 +265,38 @@ async def submit_answers(
 async def get_recommendation_history(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db),
+    genre: Optional[str] = Query(
+        None, description="Only sessions with a movie or book in this genre"
+    ),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get user's recommendation history."""
+    genre = normalize_genre(genre) if genre else None
 
     recommendations = await recommendation_crud.get_by_user_id(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db, user_id=current_user.id, genre=genre, skip=skip, limit=limit
     )
 
-    history_items = []
-    for rec in recommendations:
-        movie_count = len(rec.movie_recommendations or [])
-        book_count = len(rec.book_recommendations or [])
-
-        if movie_count > 0 and book_count > 0:
-            title = f"Movies & Books - {movie_count + book_count} recommendations"
-        elif movie_count > 0:
-            title = f"Movies - {movie_count} recommendations"
-        elif book_count > 0:
-            title = f"Books - {book_count} recommendations"
-        else:
-            title = "Recommendation Session"
-
-        history_items.append(
-            RecommendationHistoryResponse(
-                id=rec.id, title=title, created_at=rec.created_at
-            )
+    if genre:
+        total = await recommendation_crud.count_by_user_id(
+            db, user_id=current_user.id, genre=genre
+        )
+    else:
+        total = await user_counter_crud.get_value(
+            db, user_id=current_user.id, name=RECOMMENDATIONS
         )
 
+    history_items = [
+        RecommendationHistoryResponse(
+            id=rec.id, title=rec.history_title, created_at=rec.created_at
+        )
+        for rec in recommendations
+    ]
+
     return {
         "items": history_items,
-        "total": len(history_items),
+        "total": total,
         "skip": skip,
         "limit": limit,
     }
@@ -271,7 +305,7 @@ async def get_recommendation_history(
 @router.get("/{recommendation_id}", response_model=RecommendationResponse)
 async def get_recommendation_details(
     recommendation_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get detailed recommendation results."""
@@ -306,7 +340,7 @@ async def get_recommendation_details(
             poster_path=movie.poster_path,
             release_date=movie.release_date,
             runtime=movie.runtime,
-            genres=[],
+            genres=[genre.name for genre in movie.genres],
         )
         for movie in recommendation.movie_recommendations or []
     ]
@@ -323,7 +357,7 @@ async def get_recommendation_details(
             published_date=book.published_date,
             page_count=book.page_count,
             publisher=book.publisher,
-            genres=[],
+            genres=[genre.name for genre in book.genres],
         )
         for book in recommendation.book_recommendations or []
     ]
@@ -1,139 +1,165 @@
-# api/app/api/v1/endpoints/saved_items.py
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-import json
-
-from app.api.deps import get_current_active_user, get_db
+from typing import Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Response,
+    File,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.api.deps import get_current_active_user
+from app.crud.counter import user_counter_crud, saved_items_counter
+from app.crud.saved_item import saved_item_crud
 from app.models.user import User
-from app.models.saved_item import SavedItem  # You'll need to create this model
-from app.crud import saved_item as crud_saved_item  # You'll need to create this CRUD
+from app.services.import_service import import_service
+from app.utils.helpers import splice_json, json_array, prepend_json_member
+from app.schemas.saved_item import (
+    SavedItemCreate,
+    SavedItemResponse,
+    SavedItemsListResponse,
+    ItemSavedCheckResponse,
+    SavedItemsCheckRequest,
+    SavedItemsCheckResponse,
+)
 
 router = APIRouter()
 
 
-# Pydantic models for request/response
-class SaveItemRequest(BaseModel):
-    item_id: str
-    item_type: str  # "movie" or "book"
-    item_title: str
-    item_data: dict  # Full movie/book data
-
-
-class SavedItemResponse(BaseModel):
-    id: str
-    user_id: str
-    item_id: str
-    item_type: str
-    item_title: str
-    item_data: dict
-    created_at: str
-
-    class Config:
-        from_attributes = True
-
-
-class SavedItemsListResponse(BaseModel):
-    items: List[SavedItemResponse]
-    total: int
-    skip: int
-    limit: int
-
-
-class ItemSavedCheckResponse(BaseModel):
-    is_saved: bool
-
-
 @router.post("/saved-items", response_model=SavedItemResponse)
-def save_item(
-    request: SaveItemRequest,
-    db: Session = Depends(get_db),
+async def save_item(
+    item_in: SavedItemCreate,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Save an item to user's saved list"""
-
-    # Check if item is already saved
-    existing = crud_saved_item.get_saved_item(
-        db=db,
-        user_id=current_user.id,
-        item_id=request.item_id,
-        item_type=request.item_type,
+    """Save an item to user's saved list."""
+    saved_item = await saved_item_crud.create_for_user(
+        db, user_id=current_user.id, obj_in=item_in
     )
 
-    if existing:
-        raise HTTPException(status_code=400, detail="Item is already saved")
-
-    # Create new saved item
-    saved_item = crud_saved_item.create_saved_item(
-        db=db,
-        user_id=current_user.id,
-        item_id=request.item_id,
-        item_type=request.item_type,
-        item_title=request.item_title,
-        item_data=request.item_data,
-    )
+    if saved_item is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Item is already saved"
+        )
 
     return saved_item
 
 
+@router.post("/saved-items/import")
+async def import_saved_items(
+    file: UploadFile = File(..., description="Letterboxd/Goodreads CSV or JSONL"),
+    format: Optional[str] = Query(
+        None, description="csv or jsonl; inferred from the file name if omitted"
+    ),
+    item_type: Optional[str] = Query(
+        None, description="Item type for rows that don't specify one: movie or book"
+    ),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Bulk-import saved items, streaming NDJSON progress as batches complete."""
+    file_format = format
+    if file_format is None:
+        filename = (file.filename or "").lower()
+        file_format = "jsonl" if filename.endswith((".jsonl", ".ndjson")) else "csv"
+
+    if file_format not in ("csv", "jsonl"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import format must be csv or jsonl",
+        )
+
+    return StreamingResponse(
+        import_service.run(current_user.id, file, file_format, item_type),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.delete("/saved-items/{item_id}")
-def unsave_item(
+async def unsave_item(
     item_id: str,
     item_type: str = Query(..., description="Type of item: movie or book"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Remove an item from user's saved list"""
-
-    saved_item = crud_saved_item.get_saved_item(
-        db=db, user_id=current_user.id, item_id=item_id, item_type=item_type
+    """Remove an item from user's saved list."""
+    removed = await saved_item_crud.remove_for_user(
+        db, user_id=current_user.id, item_id=item_id, item_type=item_type
     )
 
-    if not saved_item:
-        raise HTTPException(status_code=404, detail="Saved item not found")
-
-    crud_saved_item.delete_saved_item(db=db, saved_item_id=saved_item.id)
+    if not removed:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Saved item not found"
+        )
 
     return {"message": "Item removed from saved list"}
 
 
 @router.get("/saved-items", response_model=SavedItemsListResponse)
-def get_saved_items(
+async def get_saved_items(
     item_type: Optional[str] = Query(
         None, description="Filter by item type: movie or book"
     ),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Get user's saved items"""
+    """Get user's saved items."""
+    rows = await saved_item_crud.get_multi_by_user_raw(
+        db, user_id=current_user.id, item_type=item_type, skip=skip, limit=limit
+    )
+    total = await user_counter_crud.get_value(
+        db, user_id=current_user.id, name=saved_items_counter(item_type)
+    )
 
-    saved_items = crud_saved_item.get_user_saved_items(
-        db=db, user_id=current_user.id, item_type=item_type, skip=skip, limit=limit
+    # Splice the stored item_data JSON straight into the body rather than
+    # parsing it only for FastAPI to serialize it again.
+    items = json_array(
+        splice_json(
+            row,
+            {"item_data": prepend_json_member(row.pop("item_data"), "id", row["item_id"])},
+        )
+        for row in rows
+    )
+    body = splice_json(
+        {"total": total, "skip": skip, "limit": limit}, {"items": items}
     )
+    return Response(content=body, media_type="application/json")
+
 
-    total = crud_saved_item.count_user_saved_items(
-        db=db, user_id=current_user.id, item_type=item_type
+@router.post("/saved-items/check", response_model=SavedItemsCheckResponse)
+async def check_items_saved(
+    check_in: SavedItemsCheckRequest,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Check which of a batch of items are saved by the user."""
+    saved = await saved_item_crud.get_saved_refs(
+        db, user_id=current_user.id, items=check_in.items
     )
 
-    return SavedItemsListResponse(
-        items=saved_items, total=total, skip=skip, limit=limit
+    return SavedItemsCheckResponse(
+        saved={
+            item.key: (item.item_type, item.item_id) in saved
+            for item in check_in.items
+        }
     )
 
 
 @router.get("/saved-items/{item_id}/check", response_model=ItemSavedCheckResponse)
-def check_item_saved(
+async def check_item_saved(
     item_id: str,
     item_type: str = Query(..., description="Type of item: movie or book"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Check if an item is saved by the user"""
-
-    saved_item = crud_saved_item.get_saved_item(
-        db=db, user_id=current_user.id, item_id=item_id, item_type=item_type
+    """Check if an item is saved by the user."""
+    saved_item = await saved_item_crud.get_by_item(
+        db, user_id=current_user.id, item_id=item_id, item_type=item_type
     )
 
     return ItemSavedCheckResponse(is_saved=saved_item is not None)
@@ -0,0 +1,32 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_read_db
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.schemas.search import SearchResponse
+from app.services.search_service import search_service
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_user_items(
+    q: str = Query(..., min_length=1, max_length=200),
+    item_type: Optional[str] = Query(
+        None, description="Filter by item type: movie or book"
+    ),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Search titles, authors and descriptions in saved items and history."""
+    return await search_service.search(
+        db,
+        user_id=current_user.id,
+        query=q,
+        item_type=item_type,
+        skip=skip,
+        limit=limit,
+    )
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_read_db
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.schemas.sync import SyncResponse
+from app.services.sync_service import sync_service
+
+router = APIRouter()
+
+
+@router.get("/sync", response_model=SyncResponse)
+async def sync_user_data(
+    since: int = Query(0, ge=0, description="Version returned by the previous sync"),
+    limit: int = Query(500, ge=1, le=1000, description="Maximum changes to apply"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get changes to saved items and recommendation history since a version."""
+    return await sync_service.get_changes(
+        db, user_id=current_user.id, since=since, limit=limit
+    )
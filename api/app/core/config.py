@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional, Tuple
 import os
 from pathlib import Path
 
@@ -23,19 +23,150 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: Optional[str] = None
     POSTGRES_DB: Optional[str] = None
 
+    # Connection pool (applies to server databases such as Postgres)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = True
+
+    # asyncpg driver tuning; set the statement cache to 0 behind pgbouncer
+    # in transaction pooling mode
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    DB_COMMAND_TIMEOUT: Optional[float] = 30.0
+
+    # Optional read replica; reads stick to the primary for this long after
+    # the same user writes so they always see their own changes. Writes are
+    # remembered per process and, for other workers and hosts, by a cookie
+    # (or header) carrying the time of the client's last write
+    READ_DATABASE_URL: Optional[str] = None
+    READ_AFTER_WRITE_WINDOW_SECONDS: float = 5.0
+    READ_AFTER_WRITE_COOKIE: str = "last_write"
+    READ_AFTER_WRITE_HEADER: str = "X-Last-Write"
+
+    # SQLite performance profile (applied to every new connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE: int = -65536  # negative values are KiB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Funnel writes through a single task that group-commits them: CRUD
+    # creates and updates, saved items and imports, the recommendation
+    # pipeline, and the counters and change log written alongside them.
+    # Account setup and password changes still commit directly. The task
+    # writes over a connection of its own, outside the DB_POOL_* pool
+    SQLITE_WRITE_QUEUE_ENABLED: bool = False
+    SQLITE_WRITE_QUEUE_MAX_BATCH: int = 64
+
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
     OPENAI_API_KEY: Optional[str] = None
+    # Comma-separated keys to spread load over, each optionally "key:org";
+    # OPENAI_API_KEY is used when unset
+    OPENAI_API_KEYS: Optional[str] = None
     TMDB_API_KEY: Optional[str] = None
     GOOGLE_BOOKS_API_KEY: Optional[str] = None
 
+    # Upstream timeouts and circuit breakers
+    OPENAI_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_MAX_RETRIES: int = 0  # SDK retries; the shared retry policy handles them
+    TMDB_TIMEOUT_SECONDS: float = 4.0
+    GOOGLE_BOOKS_TIMEOUT_SECONDS: float = 4.0
+    STRIPE_TIMEOUT_SECONDS: float = 10.0
+    CIRCUIT_WINDOW_SIZE: int = 20
+    CIRCUIT_MIN_CALLS: int = 10
+    CIRCUIT_FAILURE_RATE_THRESHOLD: float = 0.5
+    CIRCUIT_SLOW_CALL_RATE_THRESHOLD: float = 0.8
+    CIRCUIT_SLOW_CALL_RATIO: float = 0.5  # Of the upstream's timeout
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+
+    # Upstream retries: full-jitter exponential backoff or the upstream's
+    # Retry-After, with retries held to RETRY_BUDGET_RATIO of calls
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BACKOFF_BASE_SECONDS: float = 0.25
+    RETRY_BACKOFF_MAX_SECONDS: float = 4.0
+    RETRY_AFTER_MAX_SECONDS: float = 10.0
+    RETRY_BUDGET_RATIO: float = 0.1
+    RETRY_BUDGET_MAX_TOKENS: float = 10.0
+
+    # OpenAI model routing: per operation and tier, the comma-separated
+    # models good enough for it, in order of preference. Calls go to the
+    # fastest healthy one and fall back down the list on failure.
+    OPENAI_QUESTION_MODELS_FREE: str = "gpt-4o-mini,gpt-3.5-turbo"
+    OPENAI_QUESTION_MODELS_PREMIUM: str = "gpt-4o-mini,gpt-3.5-turbo"
+    OPENAI_RECOMMENDATION_MODELS_FREE: str = "gpt-4o-mini,gpt-3.5-turbo"
+    OPENAI_RECOMMENDATION_MODELS_PREMIUM: str = "gpt-4o,gpt-4-turbo"
+    MODEL_ROUTER_EWMA_ALPHA: float = 0.2
+    MODEL_ROUTER_ERROR_RATE_THRESHOLD: float = 0.5
+    MODEL_ROUTER_COOLDOWN_SECONDS: float = 60.0
+
+    # OpenAI admission control: calls beyond LLM_MAX_CONCURRENCY queue by
+    # subscription tier, premium first; a full queue is rejected with 429
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_QUEUE_SIZE_PREMIUM: int = 64
+    LLM_QUEUE_SIZE_FREE: int = 32
+
+    # Client-side pacing per upstream, in requests per second (0 disables);
+    # each limiter also follows the rate-limit headers its upstream returns
+    OPENAI_RATE_LIMIT_PER_SECOND: float = 50.0
+    TMDB_RATE_LIMIT_PER_SECOND: float = 40.0
+    GOOGLE_BOOKS_RATE_LIMIT_PER_SECOND: float = 10.0
+    STRIPE_RATE_LIMIT_PER_SECOND: float = 25.0
+
+    # Bulkheads: per-upstream cap on concurrent calls (also the size of its
+    # connection pool or thread pool) and on callers waiting for one
+    OPENAI_MAX_CONCURRENCY: int = 32
+    OPENAI_MAX_QUEUE: int = 64
+    TMDB_MAX_CONCURRENCY: int = 32
+    TMDB_MAX_QUEUE: int = 128
+    GOOGLE_BOOKS_MAX_CONCURRENCY: int = 16
+    GOOGLE_BOOKS_MAX_QUEUE: int = 64
+    STRIPE_MAX_CONCURRENCY: int = 8
+    STRIPE_MAX_QUEUE: int = 32
+
+    # Adaptive (AIMD) concurrency limit per upstream, up to its bulkhead
+    # cap: grows while latency stays within the tolerance of its baseline,
+    # shrinks on failures and slow calls
+    ADAPTIVE_CONCURRENCY_INITIAL: int = 20
+    ADAPTIVE_CONCURRENCY_MIN: int = 2
+    ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    ADAPTIVE_CONCURRENCY_BACKOFF_RATIO: float = 0.9
+
+    # Hedged TMDB and Google Books lookups: a duplicate request is raced
+    # against one still outstanding after HEDGE_PERCENTILE of recent
+    # latencies, with hedges held to HEDGE_BUDGET_RATIO of calls
+    HEDGE_ENABLED: bool = True
+    HEDGE_PERCENTILE: float = 95.0
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_LATENCY_WINDOW: int = 200
+    HEDGE_BUDGET_RATIO: float = 0.05
+    HEDGE_BUDGET_MAX_TOKENS: float = 5.0
+
+    # Recommendation request deadlines by tier; enrichment is skipped once
+    # less than ENRICHMENT_MIN_BUDGET_SECONDS remain
+    REQUEST_DEADLINE_SECONDS_FREE: float = 30.0
+    REQUEST_DEADLINE_SECONDS_PREMIUM: float = 45.0
+    ENRICHMENT_MIN_BUDGET_SECONDS: float = 3.0
+
+    # TMDB enrichment: "search_only" uses the search result alone, one call
+    # per movie; "full" also fetches movie details for the runtime
+    TMDB_ENRICHMENT_MODE: str = "search_only"
+    TMDB_GENRE_CACHE_TTL_SECONDS: int = 86400
+
     STRIPE_PUBLISHABLE_KEY: Optional[str] = None
     STRIPE_SECRET_KEY: Optional[str] = None
     STRIPE_WEBHOOK_SECRET: Optional[str] = None
 
+    # Saved-items bulk import
+    IMPORT_MAX_ITEMS: int = 5000
+    IMPORT_BATCH_SIZE: int = 100
+    IMPORT_CONCURRENCY: int = 8
+
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:5173"]
 
     SMTP_TLS: bool = True
@@ -51,9 +182,30 @@ class Settings(BaseSettings):
             return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
         return self.DATABASE_URL
 
+    @property
+    def read_database_url(self) -> str:
+        return self.READ_DATABASE_URL or self.database_url
+
+    @property
+    def is_sqlite(self) -> bool:
+        return self.database_url.startswith("sqlite")
+
+    @property
+    def openai_keys(self) -> List[Tuple[str, Optional[str]]]:
+        """Configured OpenAI (key, organization) pairs."""
+        if not self.OPENAI_API_KEYS:
+            return [(self.OPENAI_API_KEY, None)] if self.OPENAI_API_KEY else []
+        keys = []
+        for entry in self.OPENAI_API_KEYS.split(","):
+            api_key, _, organization = entry.strip().partition(":")
+            if api_key:
+                keys.append((api_key, organization or None))
+        return keys
+
     def validate_openai_key(self) -> bool:
-        """Validate that OpenAI API key is configured"""
-        return bool(self.OPENAI_API_KEY and self.OPENAI_API_KEY.startswith("sk-"))
+        """Validate that OpenAI API keys are configured"""
+        keys = self.openai_keys
+        return bool(keys) and all(api_key.startswith("sk-") for api_key, _ in keys)
 
 
 settings = Settings()
@@ -1,30 +1,254 @@
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import DeclarativeBase
-from typing import AsyncGenerator
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from contextvars import ContextVar
+from itertools import chain
+from typing import Any, AsyncGenerator, Dict, Optional
+import time
 from .config import settings
+from .metrics import metrics
 
 
 class Base(DeclarativeBase):
     pass
 
 
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.inc("db.pool.timeouts")
+            raise
+        finally:
+            metrics.observe("db.pool.checkout_wait_seconds", time.perf_counter() - start)
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Build engine keyword arguments for the configured database backend."""
+    if url.startswith("sqlite"):
+        options = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" not in url:
+            # Reuse file connections so per-connection pragmas and the page
+            # cache survive between sessions (aiosqlite defaults to NullPool).
+            options.update(
+                poolclass=InstrumentedQueuePool,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+            )
+        return options
+
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+
+    if url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+            "server_settings": {"application_name": settings.APP_NAME},
+        }
+
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the SQLite performance profile to a new connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}")
+    finally:
+        cursor.close()
+
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.DEBUG,
     future=True,
-    # SQLite specific settings
-    connect_args=(
-        {"check_same_thread": False} if "sqlite" in settings.database_url else {}
-    ),
+    **_engine_options(settings.database_url),
 )
 
+if settings.is_sqlite:
+    event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+# Read-only engine; falls back to the primary when no replica is configured
+if settings.READ_DATABASE_URL:
+    read_engine = create_async_engine(
+        settings.read_database_url,
+        echo=settings.DEBUG,
+        future=True,
+        **_engine_options(settings.read_database_url),
+    )
+    if settings.read_database_url.startswith("sqlite"):
+        event.listen(read_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+else:
+    read_engine = engine
+
+
+# Connection reserved for the SQLite write queue. Request sessions hold
+# connections from the main pool while they wait on queued writes, so a
+# writer drawing from the same pool could starve behind them.
+if settings.is_sqlite and ":memory:" not in settings.database_url:
+    write_engine = create_async_engine(
+        settings.database_url,
+        echo=settings.DEBUG,
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    event.listen(write_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+else:
+    write_engine = engine
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Report connection pool usage for the primary engine."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+
+metrics.register_gauge("db.pool", get_pool_status)
+
+# Read-your-writes tracking: user ID of the current request and the last
+# time each user wrote through this process. Other workers and hosts learn
+# of a user's writes from the marker the client sends back (see
+# ReadAfterWriteMiddleware), held per request in ``request_writes``.
+request_user_id: ContextVar[Optional[str]] = ContextVar("request_user_id", default=None)
+_recent_writes: Dict[str, float] = {}
+
+
+class RequestWrites:
+    """
+    Read-after-write marker for one request: the wall-clock time of the
+    client's last write, as it sent it back, and whether this request wrote.
+    """
+
+    def __init__(self, last_write: Optional[float] = None):
+        self.last_write = last_write
+        self.wrote = False
+
+
+request_writes: ContextVar[Optional[RequestWrites]] = ContextVar(
+    "request_writes", default=None
+)
+
+
+def record_write(user_id: Optional[str] = None) -> None:
+    """Pin the user's reads to the primary for the read-after-write window."""
+    current_user_id = request_user_id.get()
+    user_id = user_id or current_user_id
+    if not user_id:
+        return
+
+    writes = request_writes.get()
+    if writes is not None and current_user_id in (None, user_id):
+        writes.last_write = time.time()
+        writes.wrote = True
+
+    now = time.monotonic()
+    if len(_recent_writes) > 10000:
+        cutoff = now - settings.READ_AFTER_WRITE_WINDOW_SECONDS
+        for key in [k for k, v in _recent_writes.items() if v < cutoff]:
+            _recent_writes.pop(key, None)
+    _recent_writes[user_id] = now
+
+
+def wrote_recently(user_id: Optional[str] = None) -> bool:
+    """Check whether the user wrote within the read-after-write window."""
+    window = settings.READ_AFTER_WRITE_WINDOW_SECONDS
+    writes = request_writes.get()
+    if (
+        user_id is None
+        and writes is not None
+        and writes.last_write is not None
+        # Either way, in case the hosts' clocks disagree slightly
+        and abs(time.time() - writes.last_write) < window
+    ):
+        return True
+
+    user_id = user_id or request_user_id.get()
+    if not user_id or user_id not in _recent_writes:
+        return False
+    return time.monotonic() - _recent_writes[user_id] < window
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session, flush_context) -> None:
+    record_write()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj.__tablename__ == "users":
+            record_write(obj.id)
+        elif getattr(obj, "user_id", None):
+            record_write(obj.user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement(orm_execute_state) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        record_write()
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica and everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            read_engine is engine
+            or self._flushing
+            or isinstance(clause, UpdateBase)
+            or wrote_recently()
+        ):
+            return engine.sync_engine
+        return read_engine.sync_engine
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+WriteSessionLocal = async_sessionmaker(
+    write_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+ReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
@@ -32,3 +256,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints, routed to the read replica."""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
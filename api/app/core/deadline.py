@@ -0,0 +1,47 @@
+from typing import Optional
+from .config import settings
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's time budget has run out."""
+
+
+class Deadline:
+    """
+    Time budget for one request, created at the endpoint and passed down
+    explicitly to every stage that waits on an upstream.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_tier(cls, tier: str) -> "Deadline":
+        """The request deadline configured for a subscription tier."""
+        if tier.startswith("premium"):
+            return cls(settings.REQUEST_DEADLINE_SECONDS_PREMIUM)
+        return cls(settings.REQUEST_DEADLINE_SECONDS_FREE)
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def has(self, seconds: float) -> bool:
+        """Whether at least ``seconds`` of budget are left."""
+        return self.remaining() >= seconds
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Timeout for the next stage: the remaining budget, capped at ``cap``.
+        Raises DeadlineExceeded if nothing is left.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.seconds}s exceeded")
+        return min(remaining, cap) if cap is not None else remaining
@@ -0,0 +1,79 @@
+from typing import Any, Callable, Dict
+from threading import Lock
+
+
+class Histogram:
+    """Running count/sum/max summary of an observed value."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process metrics registry.
+
+    Counters and histograms are updated directly; gauges are callbacks that
+    are evaluated when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a value in a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def register_gauge(self, name: str, callback: Callable[[], Any]) -> None:
+        """Register a callback that reports the current value of a gauge."""
+        self._gauges[name] = callback
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current value of every metric."""
+        gauges = {}
+        for name, callback in self._gauges.items():
+            try:
+                gauges[name] = callback()
+            except Exception:
+                gauges[name] = None
+
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": gauges,
+                "histograms": {
+                    name: histogram.snapshot()
+                    for name, histogram in self._histograms.items()
+                },
+            }
+
+
+metrics = MetricsRegistry()
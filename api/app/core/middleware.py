@@ -0,0 +1,60 @@
+from math import ceil
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import RequestWrites, request_writes
+
+
+def _parse_marker(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Carry read-your-writes across workers and hosts.
+
+    A response to a request that wrote sets a cookie, and a header for
+    clients that do not keep cookies, holding the time of the write. When
+    the client sends either back, its reads stay on the primary for the
+    rest of the read-after-write window, whichever process serves them.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+        writes = RequestWrites(
+            _parse_marker(
+                connection.headers.get(settings.READ_AFTER_WRITE_HEADER)
+                or connection.cookies.get(settings.READ_AFTER_WRITE_COOKIE)
+            )
+        )
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start" and writes.wrote:
+                value = f"{writes.last_write:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(settings.READ_AFTER_WRITE_HEADER, value)
+                headers.append(
+                    "set-cookie",
+                    f"{settings.READ_AFTER_WRITE_COOKIE}={value}; "
+                    f"Max-Age={ceil(settings.READ_AFTER_WRITE_WINDOW_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = request_writes.set(writes)
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            request_writes.reset(token)
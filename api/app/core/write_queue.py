@@ -0,0 +1,149 @@
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+import asyncio
+import logging
+from .config import settings
+from .database import AsyncSessionLocal, WriteSessionLocal, record_write
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class WriteQueue:
+    """
+    Single-writer queue for SQLite.
+
+    Jobs submitted from many requests are executed by one background task
+    that runs as many queued jobs as are waiting in a single transaction,
+    so concurrent writers share one commit (and one fsync) instead of
+    contending for the database lock. The task writes through
+    ``writer_session_factory``, which should have a connection of its own:
+    submitters keep their request connections checked out while they wait.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        writer_session_factory: async_sessionmaker,
+        max_batch: int = 64,
+    ):
+        self.session_factory = session_factory
+        self.writer_session_factory = writer_session_factory
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self.enabled:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        metrics.register_gauge("db.write_queue.depth", self._queue.qsize)
+        logger.info("SQLite write queue started")
+
+    async def stop(self) -> None:
+        """Flush outstanding jobs and stop the writer task."""
+        if not self.enabled:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, job: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """
+        Run ``job`` with a writer session and return its result once committed.
+
+        When the queue is not running the job is executed and committed in
+        its own session.
+        """
+        if not self.enabled:
+            async with self.session_factory() as session:
+                result = await job(session)
+                await session.commit()
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def write(
+        self, db: AsyncSession, job: Callable[[AsyncSession], Awaitable[T]]
+    ) -> T:
+        """
+        Run ``job`` and commit it: through the queue when it is running,
+        otherwise in ``db``. Objects the job returns from the queue are
+        detached from the writer's session.
+        """
+        if not self.enabled:
+            result = await job(db)
+            await db.commit()
+            return result
+
+        result = await self.submit(job)
+        record_write()
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit_batch(
+        self, batch: List[Tuple[WriteJob, asyncio.Future]]
+    ) -> None:
+        metrics.observe("db.write_queue.batch_size", len(batch))
+        try:
+            async with self.writer_session_factory() as session:
+                results = [await job(session) for job, _ in batch]
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+                return
+            # One job poisoned the group commit; retry each on its own so
+            # the failure is reported only to its submitter.
+            logger.warning(f"Group commit of {len(batch)} writes failed: {e}")
+            metrics.inc("db.write_queue.batch_failures")
+            for item in batch:
+                await self._commit_batch([item])
+            return
+
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(
+        future: asyncio.Future, result: Any = None, error: Exception = None
+    ) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+write_queue = WriteQueue(
+    AsyncSessionLocal,
+    WriteSessionLocal,
+    max_batch=settings.SQLITE_WRITE_QUEUE_MAX_BATCH,
+)
@@ -2,14 +2,26 @@ from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import Base
+from app.core.database import Base, record_write
+from app.core.write_queue import write_queue
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def dialect_insert(db: AsyncSession, model: Any):
+    """
+    Return an INSERT construct for the session's backend, so callers can use
+    ``on_conflict_do_nothing``/``on_conflict_do_update`` upserts.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -33,10 +45,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """Create a new record."""
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return await self._save_new(db, db_obj)
 
     async def update(
         self,
@@ -56,11 +65,45 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
 
+        if write_queue.enabled:
+            await write_queue.submit(lambda s: self._merge(s, db_obj))
+            record_write()
+            await db.refresh(db_obj)
+            return db_obj
+
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def _save_new(self, db: AsyncSession, db_obj: ModelType) -> ModelType:
+        """Insert and commit a new object, via the write queue when it is running."""
+        if write_queue.enabled:
+            db_obj = await write_queue.submit(lambda s: self._insert(s, db_obj))
+            record_write()
+            db.add(db_obj)
+            return db_obj
+
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
 
+    @staticmethod
+    async def _insert(db: AsyncSession, db_obj: ModelType) -> ModelType:
+        """Insert a new object from the write queue's session."""
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+        return db_obj
+
+    @staticmethod
+    async def _merge(db: AsyncSession, db_obj: ModelType) -> ModelType:
+        """Copy the state of an object loaded elsewhere into the write queue's session."""
+        merged = await db.merge(db_obj)
+        await db.flush()
+        return merged
+
     async def remove(self, db: AsyncSession, *, id: Any) -> ModelType:
         """Delete a record by ID."""
         obj = await self.get(db, id=id)
@@ -0,0 +1,154 @@
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.base import CRUDBase, dialect_insert
+from app.crud.sync import user_change_crud
+from app.models.catalog import CatalogItem
+from app.models.saved_item import SavedItem
+import re
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+
+def catalog_key(item_type: str, title: str, data: Dict[str, Any]) -> str:
+    """
+    Build the key that identifies the same title across users.
+
+    Movies are keyed by title and release year, books by title and author,
+    since those fields are present both in pipeline results and in what
+    clients send when saving.
+    """
+    if item_type == "movie":
+        year = str(data.get("release_date") or data.get("year") or "")[:4]
+        return f"{_normalize(title)}|{year}"
+    return f"{_normalize(title)}|{_normalize(data.get('author'))}"
+
+
+def _catalog_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    # The per-recommendation ID is added back from the saved item on read
+    return {key: value for key, value in data.items() if key != "id"}
+
+
+class CRUDCatalogItem(CRUDBase[CatalogItem, None, None]):
+    async def get_by_key(
+        self, db: AsyncSession, *, item_type: str, key: str
+    ) -> Optional[CatalogItem]:
+        """Get a catalog entry by type and catalog key."""
+        result = await db.execute(
+            select(CatalogItem).where(
+                CatalogItem.item_type == item_type, CatalogItem.catalog_key == key
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_or_create(
+        self, db: AsyncSession, *, item_type: str, title: str, data: Dict[str, Any]
+    ) -> CatalogItem:
+        """
+        Get the catalog entry for a title, creating it from ``data`` if it
+        does not exist yet. Existing entries are left untouched. Does not commit.
+        """
+        key = catalog_key(item_type, title, data)
+        result = await db.execute(
+            dialect_insert(db, CatalogItem)
+            .values(
+                item_type=item_type,
+                catalog_key=key,
+                title=title,
+                data=_catalog_data(data),
+            )
+            .on_conflict_do_nothing(index_elements=["item_type", "catalog_key"])
+            .returning(CatalogItem)
+        )
+        catalog_item = result.scalar_one_or_none()
+        if catalog_item is None:
+            catalog_item = await self.get_by_key(db, item_type=item_type, key=key)
+        return catalog_item
+
+    async def get_or_create_many(
+        self, db: AsyncSession, *, items: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Bulk version of ``get_or_create`` for (item_type, title, data) tuples.
+
+        Returns catalog IDs keyed by (item_type, catalog key). Does not commit.
+        """
+        rows = {}
+        for item_type, title, data in items:
+            key = (item_type, catalog_key(item_type, title, data))
+            rows.setdefault(
+                key,
+                {
+                    "item_type": item_type,
+                    "catalog_key": key[1],
+                    "title": title,
+                    "data": _catalog_data(data),
+                },
+            )
+        if not rows:
+            return {}
+
+        await db.execute(
+            dialect_insert(db, CatalogItem)
+            .values(list(rows.values()))
+            .on_conflict_do_nothing(index_elements=["item_type", "catalog_key"])
+        )
+        result = await db.execute(
+            select(CatalogItem.item_type, CatalogItem.catalog_key, CatalogItem.id).where(
+                tuple_(CatalogItem.item_type, CatalogItem.catalog_key).in_(list(rows))
+            )
+        )
+        return {(item_type, key): id for item_type, key, id in result.all()}
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        *,
+        item_type: str,
+        title: str,
+        data: Dict[str, Any],
+        fields: Dict[str, Any],
+    ) -> Optional[CatalogItem]:
+        """
+        Merge ``fields`` into the existing catalog entry for a title, keyed
+        by ``data``. Only canonical TMDB or Google Books fields belong here,
+        never model output, since the entry is shared by every user who
+        saved the title. Titles nobody saved have no entry and are skipped.
+
+        Only when the data actually changes is every saved item showing the
+        entry logged as changed for its user. Returns the entry if its data
+        changed. Does not commit.
+        """
+        catalog_item = await self.get_by_key(
+            db, item_type=item_type, key=catalog_key(item_type, title, data)
+        )
+        if catalog_item is None:
+            return None
+
+        refreshed = {**catalog_item.data, **_catalog_data(fields)}
+        if refreshed == catalog_item.data:
+            return None
+
+        catalog_item.data = refreshed
+        await db.flush()
+
+        saved = await db.execute(
+            select(SavedItem.user_id, SavedItem.item_type, SavedItem.item_id)
+            .where(SavedItem.catalog_item_id == catalog_item.id)
+            .order_by(SavedItem.user_id)
+        )
+        for user_id, rows in groupby(saved.all(), key=itemgetter(0)):
+            await user_change_crud.record(
+                db,
+                user_id=user_id,
+                entity="saved_item",
+                entity_ids=[f"{item_type}:{item_id}" for _, item_type, item_id in rows],
+            )
+        return catalog_item
+
+
+catalog_item_crud = CRUDCatalogItem(CatalogItem)
@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional
+from collections import Counter
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.base import CRUDBase, dialect_insert
+from app.models.counter import UserCounter
+from app.models.recommendation import Recommendation
+from app.models.saved_item import SavedItem
+
+SAVED_ITEMS = "saved_items"
+RECOMMENDATIONS = "recommendations"
+# Not a count of rows: the user's change log version, see UserChange
+SYNC_VERSION = "sync_version"
+
+
+def saved_items_counter(item_type: Optional[str] = None) -> str:
+    """Counter name for a user's saved items, optionally of one type."""
+    return f"{SAVED_ITEMS}.{item_type}" if item_type else SAVED_ITEMS
+
+
+class CRUDUserCounter(CRUDBase[UserCounter, None, None]):
+    async def get_value(self, db: AsyncSession, *, user_id: str, name: str) -> int:
+        """Get one of a user's counters; counters never written are 0."""
+        result = await db.execute(
+            select(UserCounter.value).where(
+                UserCounter.user_id == user_id, UserCounter.name == name
+            )
+        )
+        return result.scalar() or 0
+
+    async def increment(
+        self, db: AsyncSession, *, user_id: str, deltas: Dict[str, int]
+    ) -> None:
+        """Add ``deltas`` to a user's counters in one statement. Does not commit."""
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        statement = dialect_insert(db, UserCounter).values(
+            [
+                {"user_id": user_id, "name": name, "value": delta}
+                for name, delta in deltas.items()
+            ]
+        )
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "name"],
+                set_={
+                    "value": UserCounter.value + statement.excluded.value,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    async def bump(
+        self, db: AsyncSession, *, user_id: str, name: str, delta: int = 1
+    ) -> int:
+        """
+        Add ``delta`` to one of a user's counters and return the new value.
+        The row stays locked until the transaction ends. Does not commit.
+        """
+        statement = dialect_insert(db, UserCounter).values(
+            user_id=user_id, name=name, value=delta
+        )
+        result = await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["user_id", "name"],
+                set_={
+                    "value": UserCounter.value + statement.excluded.value,
+                    "updated_at": func.now(),
+                },
+            ).returning(UserCounter.value)
+        )
+        return result.scalar_one()
+
+    async def add_saved_items(
+        self, db: AsyncSession, *, user_id: str, item_types: List[str], sign: int = 1
+    ) -> None:
+        """Count saved items added (or with ``sign=-1`` removed) for a user."""
+        deltas = {SAVED_ITEMS: sign * len(item_types)}
+        for item_type, count in Counter(item_types).items():
+            deltas[saved_items_counter(item_type)] = sign * count
+        await self.increment(db, user_id=user_id, deltas=deltas)
+
+    async def recount(self, db: AsyncSession, *, user_ids: List[str]) -> None:
+        """Rebuild users' counters from the rows they count. Does not commit."""
+        if not user_ids:
+            return
+
+        rows: Dict[tuple, int] = {}
+        saved = await db.execute(
+            select(SavedItem.user_id, SavedItem.item_type, func.count())
+            .where(SavedItem.user_id.in_(user_ids))
+            .group_by(SavedItem.user_id, SavedItem.item_type)
+        )
+        for user_id, item_type, count in saved.all():
+            rows[(user_id, saved_items_counter(item_type))] = count
+            rows[(user_id, SAVED_ITEMS)] = rows.get((user_id, SAVED_ITEMS), 0) + count
+
+        recommendations = await db.execute(
+            select(Recommendation.user_id, func.count())
+            .where(Recommendation.user_id.in_(user_ids))
+            .group_by(Recommendation.user_id)
+        )
+        for user_id, count in recommendations.all():
+            rows[(user_id, RECOMMENDATIONS)] = count
+
+        await db.execute(
+            delete(UserCounter).where(
+                UserCounter.user_id.in_(user_ids), UserCounter.name != SYNC_VERSION
+            )
+        )
+        if rows:
+            await db.execute(
+                dialect_insert(db, UserCounter).values(
+                    [
+                        {"user_id": user_id, "name": name, "value": value}
+                        for (user_id, name), value in rows.items()
+                    ]
+                )
+            )
+
+
+user_counter_crud = CRUDUserCounter(UserCounter)
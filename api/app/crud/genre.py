@@ -0,0 +1,51 @@
+from typing import Iterable, List, Tuple
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.base import CRUDBase, dialect_insert
+from app.models.recommendation import Genre
+
+
+def normalize_genre(name: str) -> str:
+    """Canonical spelling for a genre name, so "sci-fi" and "Sci-Fi" match."""
+    return " ".join(str(name).split()).title()
+
+
+class CRUDGenre(CRUDBase[Genre, None, None]):
+    async def upsert_many(self, db: AsyncSession, *, names: Iterable[str]) -> None:
+        """Insert any genres that don't exist yet in one statement. Does not commit."""
+        names = sorted(set(names))
+        if not names:
+            return
+
+        await db.execute(
+            dialect_insert(db, Genre)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+
+    async def link(
+        self,
+        db: AsyncSession,
+        *,
+        association: Table,
+        rows: List[Tuple[str, str]],
+    ) -> None:
+        """
+        Upsert genres and insert (item ID, genre) rows into a genre
+        association table in two statements. Does not commit.
+        """
+        if not rows:
+            return
+
+        await self.upsert_many(db, names=(genre for _, genre in rows))
+        item_column = next(
+            column.name for column in association.primary_key if column.name != "genre"
+        )
+        await db.execute(
+            dialect_insert(db, association)
+            .values([{item_column: item_id, "genre": genre} for item_id, genre in set(rows)])
+            .on_conflict_do_nothing()
+        )
+
+
+genre_crud = CRUDGenre(Genre)
@@ -25,10 +25,7 @@ class CRUDUserPreferences(
         create_data = obj_in.dict()
         create_data["user_id"] = user_id
         db_obj = UserPreferences(**create_data)
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return await self._save_new(db, db_obj)
 
 
 preferences_crud = CRUDUserPreferences(UserPreferences)
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, exists, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from app.crud.base import CRUDBase
@@ -10,17 +10,42 @@ from app.models.recommendation import (
     MovieRecommendation,
     BookRecommendation,
     UserRecommendationHistory,
+    movie_genres,
+    book_genres,
 )
 
 
+def _has_genre(genre: str):
+    """Filter for recommendations with a movie or book in ``genre``."""
+    return or_(
+        exists()
+        .where(movie_genres.c.genre == genre)
+        .where(MovieRecommendation.id == movie_genres.c.movie_recommendation_id)
+        .where(MovieRecommendation.recommendation_id == Recommendation.id),
+        exists()
+        .where(book_genres.c.genre == genre)
+        .where(BookRecommendation.id == book_genres.c.book_recommendation_id)
+        .where(BookRecommendation.recommendation_id == Recommendation.id),
+    )
+
+
 class CRUDRecommendation(CRUDBase[Recommendation, None, None]):
     async def get_by_user_id(
-        self, db: AsyncSession, *, user_id: str, skip: int = 0, limit: int = 10
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        genre: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10,
     ) -> List[Recommendation]:
         """Get user's recommendations with related data."""
+        query = select(Recommendation).where(Recommendation.user_id == user_id)
+        if genre:
+            query = query.where(_has_genre(genre))
+
         result = await db.execute(
-            select(Recommendation)
-            .where(Recommendation.user_id == user_id)
+            query
             .options(
                 selectinload(Recommendation.questions),
                 selectinload(Recommendation.movie_recommendations),
@@ -32,6 +57,36 @@ class CRUDRecommendation(CRUDBase[Recommendation, None, None]):
         )
         return result.scalars().all()
 
+    async def count_by_user_id(
+        self, db: AsyncSession, *, user_id: str, genre: Optional[str] = None
+    ) -> int:
+        """Count a user's recommendations, optionally only those in a genre."""
+        query = select(func.count(Recommendation.id)).where(
+            Recommendation.user_id == user_id
+        )
+        if genre:
+            query = query.where(_has_genre(genre))
+
+        result = await db.execute(query)
+        return result.scalar()
+
+    async def get_multi_by_ids(
+        self, db: AsyncSession, *, user_id: str, ids: List[str]
+    ) -> List[Recommendation]:
+        """Get a user's recommendations by ID with their movies and books."""
+        if not ids:
+            return []
+
+        result = await db.execute(
+            select(Recommendation)
+            .where(Recommendation.user_id == user_id, Recommendation.id.in_(ids))
+            .options(
+                selectinload(Recommendation.movie_recommendations),
+                selectinload(Recommendation.book_recommendations),
+            )
+        )
+        return result.scalars().all()
+
     async def get_with_details(
         self, db: AsyncSession, *, recommendation_id: str
     ) -> Optional[Recommendation]:
@@ -43,8 +98,12 @@ class CRUDRecommendation(CRUDBase[Recommendation, None, None]):
                 selectinload(Recommendation.questions).selectinload(
                     RecommendationQuestion.answers
                 ),
-                selectinload(Recommendation.movie_recommendations),
-                selectinload(Recommendation.book_recommendations),
+                selectinload(Recommendation.movie_recommendations).selectinload(
+                    MovieRecommendation.genres
+                ),
+                selectinload(Recommendation.book_recommendations).selectinload(
+                    BookRecommendation.genres
+                ),
             )
         )
         return result.scalar_one_or_none()
@@ -1,112 +1,268 @@
-# api/app/crud/saved_item.py
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-import json
-
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, delete, func, tuple_, cast, Text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.write_queue import write_queue
+from app.crud.base import CRUDBase, dialect_insert
+from app.crud.catalog import catalog_item_crud, catalog_key
+from app.crud.counter import user_counter_crud
+from app.crud.sync import user_change_crud
+from app.models.catalog import CatalogItem
 from app.models.saved_item import SavedItem
+from app.schemas.saved_item import SavedItemCreate, SavedItemRef
 
 
-def create_saved_item(
-    db: Session,
-    *,
-    user_id: str,
-    item_id: str,
-    item_type: str,
-    item_title: str,
-    item_data: dict
-) -> SavedItem:
-    """Create a new saved item"""
-
-    saved_item = SavedItem(
-        user_id=user_id,
-        item_id=item_id,
-        item_type=item_type,
-        item_title=item_title,
-        item_data=json.dumps(item_data),  # Store as JSON string
-    )
-
-    db.add(saved_item)
-    db.commit()
-    db.refresh(saved_item)
-
-    return saved_item
-
-
-def get_saved_item(
-    db: Session, *, user_id: str, item_id: str, item_type: str
-) -> Optional[SavedItem]:
-    """Get a specific saved item"""
-
-    return (
-        db.query(SavedItem)
-        .filter(
-            and_(
+class CRUDSavedItem(CRUDBase[SavedItem, SavedItemCreate, None]):
+    async def get_by_item(
+        self, db: AsyncSession, *, user_id: str, item_id: str, item_type: str
+    ) -> Optional[SavedItem]:
+        """Get a user's saved item by item ID and type."""
+        result = await db.execute(
+            select(SavedItem).where(
                 SavedItem.user_id == user_id,
                 SavedItem.item_id == item_id,
                 SavedItem.item_type == item_type,
             )
         )
-        .first()
-    )
+        return result.scalar_one_or_none()
 
+    async def get_saved_refs(
+        self, db: AsyncSession, *, user_id: str, items: List[SavedItemRef]
+    ) -> Set[Tuple[str, str]]:
+        """Return the (item_type, item_id) pairs from ``items`` the user has saved."""
+        if not items:
+            return set()
 
-def get_user_saved_items(
-    db: Session,
-    *,
-    user_id: str,
-    item_type: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50
-) -> List[SavedItem]:
-    """Get user's saved items with optional filtering"""
+        result = await db.execute(
+            select(SavedItem.item_type, SavedItem.item_id).where(
+                SavedItem.user_id == user_id,
+                tuple_(SavedItem.item_type, SavedItem.item_id).in_(
+                    {(item.item_type, item.item_id) for item in items}
+                ),
+            )
+        )
+        return {(item_type, item_id) for item_type, item_id in result.all()}
 
-    query = db.query(SavedItem).filter(SavedItem.user_id == user_id)
+    async def get_by_refs(
+        self, db: AsyncSession, *, user_id: str, refs: List[Tuple[str, str]]
+    ) -> List[SavedItem]:
+        """Get a user's saved items by (item_type, item_id) pairs."""
+        if not refs:
+            return []
 
-    if item_type:
-        query = query.filter(SavedItem.item_type == item_type)
+        result = await db.execute(
+            select(SavedItem).where(
+                SavedItem.user_id == user_id,
+                tuple_(SavedItem.item_type, SavedItem.item_id).in_(set(refs)),
+            )
+        )
+        return result.scalars().all()
 
-    return query.order_by(SavedItem.created_at.desc()).offset(skip).limit(limit).all()
+    async def get_multi_by_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        item_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[SavedItem]:
+        """Get a user's saved items, newest first."""
+        query = select(SavedItem).where(SavedItem.user_id == user_id)
+        if item_type:
+            query = query.where(SavedItem.item_type == item_type)
 
+        result = await db.execute(
+            query.order_by(SavedItem.created_at.desc()).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
 
-def count_user_saved_items(
-    db: Session, *, user_id: str, item_type: Optional[str] = None
-) -> int:
-    """Count user's saved items"""
+    async def get_multi_by_user_raw(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        item_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a user's saved items as plain rows with ``item_data`` left as
+        the catalog entry's stored JSON text, for responses that pass it
+        through unparsed.
+        """
+        query = (
+            select(
+                SavedItem.id,
+                SavedItem.user_id,
+                SavedItem.item_id,
+                SavedItem.item_type,
+                SavedItem.item_title,
+                SavedItem.created_at,
+                cast(CatalogItem.data, Text).label("item_data"),
+            )
+            .join(CatalogItem, CatalogItem.id == SavedItem.catalog_item_id)
+            .where(SavedItem.user_id == user_id)
+        )
+        if item_type:
+            query = query.where(SavedItem.item_type == item_type)
 
-    query = db.query(func.count(SavedItem.id)).filter(SavedItem.user_id == user_id)
+        result = await db.execute(
+            query.order_by(SavedItem.created_at.desc()).offset(skip).limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
 
-    if item_type:
-        query = query.filter(SavedItem.item_type == item_type)
+    async def count_by_user(
+        self, db: AsyncSession, *, user_id: str, item_type: Optional[str] = None
+    ) -> int:
+        """Count a user's saved items."""
+        query = select(func.count(SavedItem.id)).where(SavedItem.user_id == user_id)
+        if item_type:
+            query = query.where(SavedItem.item_type == item_type)
 
-    return query.scalar()
+        result = await db.execute(query)
+        return result.scalar()
 
+    async def create_for_user(
+        self, db: AsyncSession, *, user_id: str, obj_in: SavedItemCreate
+    ) -> Optional[SavedItem]:
+        """Save an item for a specific user. Returns None if it was already saved."""
+        saved_item, catalog_item = await write_queue.write(
+            db, lambda s: self._create_for_user(s, user_id=user_id, obj_in=obj_in)
+        )
+        if saved_item is not None:
+            set_committed_value(saved_item, "catalog_item", catalog_item)
+        return saved_item
 
-def delete_saved_item(db: Session, *, saved_item_id: str) -> bool:
-    """Delete a saved item"""
+    async def _create_for_user(
+        self, db: AsyncSession, *, user_id: str, obj_in: SavedItemCreate
+    ) -> Tuple[Optional[SavedItem], CatalogItem]:
+        catalog_item = await catalog_item_crud.get_or_create(
+            db,
+            item_type=obj_in.item_type,
+            title=obj_in.item_title,
+            data=obj_in.item_data,
+        )
+        result = await db.execute(
+            dialect_insert(db, SavedItem)
+            .values(
+                user_id=user_id,
+                item_id=obj_in.item_id,
+                item_type=obj_in.item_type,
+                item_title=obj_in.item_title,
+                catalog_item_id=catalog_item.id,
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "item_type", "item_id"])
+            .returning(SavedItem)
+        )
+        saved_item = result.scalar_one_or_none()
+        if saved_item is not None:
+            await user_change_crud.record(
+                db,
+                user_id=user_id,
+                entity="saved_item",
+                entity_ids=[f"{obj_in.item_type}:{obj_in.item_id}"],
+            )
+            await user_counter_crud.add_saved_items(
+                db, user_id=user_id, item_types=[obj_in.item_type]
+            )
+        return saved_item, catalog_item
 
-    saved_item = db.query(SavedItem).filter(SavedItem.id == saved_item_id).first()
+    async def create_many_for_user(
+        self, db: AsyncSession, *, user_id: str, items: List[SavedItemCreate]
+    ) -> int:
+        """
+        Bulk-save items for a user in two statements, skipping items that are
+        already saved, whether under the same item ID or as the same catalog
+        title under another ID. Returns the number of new saved items. Does
+        not commit.
+        """
+        if not items:
+            return 0
 
-    if saved_item:
-        db.delete(saved_item)
-        db.commit()
-        return True
+        catalog_ids = await catalog_item_crud.get_or_create_many(
+            db,
+            items=[(item.item_type, item.item_title, item.item_data) for item in items],
+        )
+        rows = {}
+        item_keys = set()
+        for item in items:
+            key = (item.item_type, catalog_key(item.item_type, item.item_title, item.item_data))
+            if catalog_ids[key] in rows or (item.item_type, item.item_id) in item_keys:
+                continue
+            item_keys.add((item.item_type, item.item_id))
+            rows[catalog_ids[key]] = {
+                "user_id": user_id,
+                "item_id": item.item_id,
+                "item_type": item.item_type,
+                "item_title": item.item_title,
+                "catalog_item_id": catalog_ids[key],
+            }
 
-    return False
+        already_saved = await db.execute(
+            select(SavedItem.catalog_item_id).where(
+                SavedItem.user_id == user_id, SavedItem.catalog_item_id.in_(list(rows))
+            )
+        )
+        for catalog_item_id in already_saved.scalars():
+            del rows[catalog_item_id]
+        if not rows:
+            return 0
 
+        result = await db.execute(
+            dialect_insert(db, SavedItem)
+            .values(list(rows.values()))
+            .on_conflict_do_nothing(index_elements=["user_id", "item_type", "item_id"])
+            .returning(SavedItem.item_type, SavedItem.item_id)
+        )
+        inserted = result.all()
+        await user_change_crud.record(
+            db,
+            user_id=user_id,
+            entity="saved_item",
+            entity_ids=[f"{item_type}:{item_id}" for item_type, item_id in inserted],
+        )
+        await user_counter_crud.add_saved_items(
+            db, user_id=user_id, item_types=[item_type for item_type, _ in inserted]
+        )
+        return len(inserted)
 
-def delete_user_saved_item(
-    db: Session, *, user_id: str, item_id: str, item_type: str
-) -> bool:
-    """Delete a specific user's saved item"""
+    async def remove_for_user(
+        self, db: AsyncSession, *, user_id: str, item_id: str, item_type: str
+    ) -> bool:
+        """Remove a user's saved item. Returns False if it was not saved."""
+        return await write_queue.write(
+            db,
+            lambda s: self._remove_for_user(
+                s, user_id=user_id, item_id=item_id, item_type=item_type
+            ),
+        )
 
-    saved_item = get_saved_item(
-        db=db, user_id=user_id, item_id=item_id, item_type=item_type
-    )
+    async def _remove_for_user(
+        self, db: AsyncSession, *, user_id: str, item_id: str, item_type: str
+    ) -> bool:
+        result = await db.execute(
+            delete(SavedItem)
+            .where(
+                SavedItem.user_id == user_id,
+                SavedItem.item_id == item_id,
+                SavedItem.item_type == item_type,
+            )
+            .returning(SavedItem.id)
+        )
+        removed_id = result.scalar_one_or_none()
+        if removed_id is not None:
+            await user_change_crud.record(
+                db,
+                user_id=user_id,
+                entity="saved_item",
+                entity_ids=[f"{item_type}:{item_id}"],
+                op="delete",
+            )
+            await user_counter_crud.add_saved_items(
+                db, user_id=user_id, item_types=[item_type], sign=-1
+            )
+        return removed_id is not None
 
-    if saved_item:
-        db.delete(saved_item)
-        db.commit()
-        return True
 
-    return False
+saved_item_crud = CRUDSavedItem(SavedItem)
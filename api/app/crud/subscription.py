@@ -34,10 +34,7 @@ class CRUDSubscription(CRUDBase[Subscription, SubscriptionCreate, SubscriptionUp
         create_data = obj_in.dict()
         create_data["user_id"] = user_id
         db_obj = Subscription(**create_data)
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return await self._save_new(db, db_obj)
 
 
 subscription_crud = CRUDSubscription(Subscription)
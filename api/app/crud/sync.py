@@ -0,0 +1,61 @@
+from typing import Iterable, List
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.base import CRUDBase
+from app.crud.counter import user_counter_crud, SYNC_VERSION
+from app.models.sync import UserChange
+
+
+class CRUDUserChange(CRUDBase[UserChange, None, None]):
+    async def record(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        entity: str,
+        entity_ids: Iterable[str],
+        op: str = "upsert",
+    ) -> None:
+        """Append changes to the user's log under new versions. Does not commit."""
+        entity_ids = list(entity_ids)
+        if not entity_ids:
+            return
+
+        version = await user_counter_crud.bump(
+            db, user_id=user_id, name=SYNC_VERSION, delta=len(entity_ids)
+        )
+        first = version - len(entity_ids) + 1
+        await db.execute(
+            insert(UserChange),
+            [
+                {
+                    "user_id": user_id,
+                    "version": first + index,
+                    "entity": entity,
+                    "entity_id": entity_id,
+                    "op": op,
+                }
+                for index, entity_id in enumerate(entity_ids)
+            ],
+        )
+
+    async def get_since(
+        self, db: AsyncSession, *, user_id: str, since: int, limit: int = 500
+    ) -> List[UserChange]:
+        """Get a user's changes after version ``since``, oldest first."""
+        result = await db.execute(
+            select(UserChange)
+            .where(UserChange.user_id == user_id, UserChange.version > since)
+            .order_by(UserChange.version)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def current_version(self, db: AsyncSession, *, user_id: str) -> int:
+        """Get the user's latest change version, or 0 if nothing has changed."""
+        return await user_counter_crud.get_value(
+            db, user_id=user_id, name=SYNC_VERSION
+        )
+
+
+user_change_crud = CRUDUserChange(UserChange)
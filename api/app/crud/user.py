@@ -18,10 +18,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         create_data = obj_in.dict()
         create_data.pop("password")
         db_obj = User(**create_data, hashed_password=get_password_hash(obj_in.password))
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return await self._save_new(db, db_obj)
 
     async def authenticate(
         self, db: AsyncSession, *, email: str, password: str
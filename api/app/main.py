@@ -2,7 +2,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, write_engine, Base
+from app.core.metrics import metrics
+from app.core.middleware import ReadAfterWriteMiddleware
+from app.core.search_index import ensure_search_index
+from app.core.write_queue import write_queue
 from app.api.v1.api import api_router
 
 import app.models
@@ -14,13 +18,19 @@ async def lifespan(app: FastAPI):
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await ensure_search_index(conn)
         print("Database tables created/verified successfully")
     except Exception as e:
         print(f"Error with database setup: {e}")
         raise
 
+    if settings.is_sqlite and settings.SQLITE_WRITE_QUEUE_ENABLED:
+        write_queue.start()
+
     yield
 
+    await write_queue.stop()
+    await write_engine.dispose()
     await engine.dispose()
     print("Application shutdown complete")
 
@@ -32,12 +42,15 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(ReadAfterWriteMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[settings.READ_AFTER_WRITE_HEADER],
 )
 
 app.include_router(api_router, prefix="/api/v1")
@@ -53,6 +66,11 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -3,6 +3,9 @@ from .user import User
 from .subscription import Subscription
 from .preferences import UserPreferences
 from .saved_item import SavedItem  # Add this import
+from .catalog import CatalogItem
+from .sync import UserChange
+from .counter import UserCounter
 from .recommendation import (
     UserRecommendationHistory,
     Recommendation,
@@ -23,6 +26,9 @@ __all__ = [
     "Subscription",
     "UserPreferences",
     "SavedItem",  # Add this to exports
+    "CatalogItem",
+    "UserChange",
+    "UserCounter",
     "UserRecommendationHistory",
     "Recommendation",
     "RecommendationQuestion",
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, DateTime, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+import uuid
+from app.core.database import Base
+
+
+class CatalogItem(Base):
+    """A movie or book shared by every saved item that refers to it."""
+
+    __tablename__ = "catalog_items"
+    __table_args__ = (
+        Index("uq_catalog_items_type_key", "item_type", "catalog_key", unique=True),
+    )
+
+    id = Column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True
+    )
+    item_type = Column(String, nullable=False)  # "movie" or "book"
+    catalog_key = Column(String, nullable=False)  # normalized title + year/author
+    title = Column(String, nullable=False)
+    data = Column(
+        JSON().with_variant(JSONB(), "postgresql"), nullable=False
+    )  # Full item data
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<CatalogItem(id={self.id}, item_type={self.item_type}, title={self.title})>"
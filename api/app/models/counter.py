@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UserCounter(Base):
+    """Per-user running count, maintained alongside the rows it counts."""
+
+    __tablename__ = "user_counters"
+
+    user_id = Column(
+        String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    name = Column(String, primary_key=True)  # e.g. "saved_items.movie"
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<UserCounter(user_id={self.user_id}, name={self.name}, value={self.value})>"
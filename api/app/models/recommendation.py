@@ -25,7 +25,7 @@ class Recommendation(Base):
     id = Column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True
     )
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
     type = Column(String, nullable=False)  # "movie", "book", "both"
     timestamp = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -40,6 +40,20 @@ class Recommendation(Base):
         "BookRecommendation", back_populates="recommendation"
     )
 
+    @property
+    def history_title(self) -> str:
+        """Title shown for this session in the user's history."""
+        movie_count = len(self.movie_recommendations or [])
+        book_count = len(self.book_recommendations or [])
+
+        if movie_count > 0 and book_count > 0:
+            return f"Movies & Books - {movie_count + book_count} recommendations"
+        elif movie_count > 0:
+            return f"Movies - {movie_count} recommendations"
+        elif book_count > 0:
+            return f"Books - {book_count} recommendations"
+        return "Recommendation Session"
+
 
 class RecommendationQuestion(Base):
     __tablename__ = "recommendation_questions"
@@ -85,7 +99,7 @@ movie_genres = Table(
         ForeignKey("movie_recommendations.id"),
         primary_key=True,
     ),
-    Column("genre", String, ForeignKey("genres.name"), primary_key=True),
+    Column("genre", String, ForeignKey("genres.name"), primary_key=True, index=True),
 )
 
 book_genres = Table(
@@ -97,7 +111,7 @@ book_genres = Table(
         ForeignKey("book_recommendations.id"),
         primary_key=True,
     ),
-    Column("genre", String, ForeignKey("genres.name"), primary_key=True),
+    Column("genre", String, ForeignKey("genres.name"), primary_key=True, index=True),
 )
 
 
@@ -114,7 +128,7 @@ class MovieRecommendation(Base):
         String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True
     )
     recommendation_id = Column(
-        String(36), ForeignKey("recommendations.id"), nullable=False
+        String(36), ForeignKey("recommendations.id"), nullable=False, index=True
     )
     title = Column(String, nullable=False)
     rating = Column(Float)  # 0-5 rating
@@ -140,7 +154,7 @@ class BookRecommendation(Base):
         String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True
     )
     recommendation_id = Column(
-        String(36), ForeignKey("recommendations.id"), nullable=False
+        String(36), ForeignKey("recommendations.id"), nullable=False, index=True
     )
     title = Column(String, nullable=False)
     author = Column(String, nullable=False)
@@ -1,5 +1,5 @@
 # api/app/models/saved_item.py
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -8,6 +8,11 @@ from app.core.database import Base
 
 class SavedItem(Base):
     __tablename__ = "saved_items"
+    __table_args__ = (
+        Index(
+            "uq_saved_items_user_item", "user_id", "item_type", "item_id", unique=True
+        ),
+    )
 
     id = Column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True
@@ -16,11 +21,19 @@ class SavedItem(Base):
     item_id = Column(String, nullable=False, index=True)  # Movie/Book ID
     item_type = Column(String, nullable=False, index=True)  # "movie" or "book"
     item_title = Column(String, nullable=False)
-    item_data = Column(Text, nullable=False)  # JSON string of full item data
+    catalog_item_id = Column(
+        String(36), ForeignKey("catalog_items.id"), nullable=False, index=True
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationship
     user = relationship("User", back_populates="saved_items")
+    catalog_item = relationship("CatalogItem", lazy="joined", innerjoin=True)
+
+    @property
+    def item_data(self) -> dict:
+        """Full item data from the shared catalog entry."""
+        return {"id": self.item_id, **self.catalog_item.data}
 
     def __repr__(self):
         return f"<SavedItem(id={self.id}, user_id={self.user_id}, item_type={self.item_type}, item_title={self.item_title})>"
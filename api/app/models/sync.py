@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UserChange(Base):
+    """
+    Append-only log of changes to a user's synced data.
+
+    Each change carries a per-user version taken from the user's
+    ``sync_version`` counter in the same transaction, so a client that has
+    seen version N asks for changes with ``version > N``. Bumping the
+    counter locks it until commit, so a user's versions become visible in
+    order, which a shared autoincrement ID does not guarantee.
+    """
+
+    __tablename__ = "user_changes"
+    __table_args__ = (Index("ix_user_changes_user_version", "user_id", "version"),)
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    user_id = Column(
+        String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    version = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False)
+    entity = Column(String, nullable=False)  # "saved_item" or "recommendation"
+    entity_id = Column(String, nullable=False)  # "type:item_id" for saved items
+    op = Column(String, nullable=False)  # "upsert" or "delete"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<UserChange(user_id={self.user_id}, version={self.version}, entity={self.entity}, op={self.op})>"
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List
+from datetime import datetime
+
+
+class SavedItemCreate(BaseModel):
+    item_id: str
+    item_type: str  # "movie" or "book"
+    item_title: str
+    item_data: Dict[str, Any]  # Full movie/book data
+
+
+class SavedItemResponse(BaseModel):
+    id: str
+    user_id: str
+    item_id: str
+    item_type: str
+    item_title: str
+    item_data: Dict[str, Any]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SavedItemsListResponse(BaseModel):
+    items: List[SavedItemResponse]
+    total: int
+    skip: int
+    limit: int
+
+
+class ItemSavedCheckResponse(BaseModel):
+    is_saved: bool
+
+
+class SavedItemRef(BaseModel):
+    item_id: str
+    item_type: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.item_type}:{self.item_id}"
+
+
+class SavedItemsCheckRequest(BaseModel):
+    items: List[SavedItemRef] = Field(..., max_length=200)
+
+
+class SavedItemsCheckResponse(BaseModel):
+    saved: Dict[str, bool]  # keyed by "<item_type>:<item_id>"
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SearchResult(BaseModel):
+    source: str  # "saved_item" or "recommendation"
+    item_type: str  # "movie" or "book"
+    id: str  # Saved item or movie/book recommendation ID
+    item_id: Optional[str] = None  # Saved items only
+    recommendation_id: Optional[str] = None  # Recommendations only
+    title: str
+    author: Optional[str] = None
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    items: List[SearchResult]
+    skip: int
+    limit: int
+    has_more: bool
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.recommendation import RecommendationHistoryResponse
+from app.schemas.saved_item import SavedItemRef, SavedItemResponse
+
+
+class SavedItemsDelta(BaseModel):
+    upserted: List[SavedItemResponse] = []
+    deleted: List[SavedItemRef] = []
+
+
+class RecommendationsDelta(BaseModel):
+    upserted: List[RecommendationHistoryResponse] = []
+    deleted: List[str] = []
+
+
+class SyncResponse(BaseModel):
+    version: int  # Pass back as ``since`` on the next sync
+    has_more: bool = False
+    reset: bool = False  # ``since`` is unknown; drop local state and sync from 0
+    saved_items: SavedItemsDelta = SavedItemsDelta()
+    recommendations: RecommendationsDelta = RecommendationsDelta()
@@ -0,0 +1,137 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Sequence
+from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.core.metrics import metrics
+import asyncio
+import math
+import time
+
+
+class AdmissionRejected(Exception):
+    """Raised when a priority class's queue is full."""
+
+    def __init__(self, name: str, priority: str, retry_after: float):
+        super().__init__(f"{name} is at capacity for {priority} requests")
+        self.name = name
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+def tier_priority(tier: str) -> str:
+    """Admission class for a subscription tier."""
+    return "premium" if tier.startswith("premium") else "free"
+
+
+class PriorityLimiter:
+    """
+    Concurrency limit shared by several priority classes.
+
+    Up to ``limit`` callers hold a slot at once. The rest wait in a bounded
+    queue per class, and a freed slot goes to the oldest waiter of the
+    highest class with one. A caller whose class queue is full is rejected
+    with an estimate of when to retry, based on how long slots are held.
+    """
+
+    def __init__(self, name: str, *, limit: int, queue_sizes: Dict[str, int]):
+        self.name = name
+        self.limit = limit
+        self.priorities: Sequence[str] = list(queue_sizes)
+        self.queue_sizes = queue_sizes
+        self._queues: Dict[str, Deque[asyncio.Future]] = {
+            priority: deque() for priority in self.priorities
+        }
+        self._active = 0
+        self._hold_seconds = 1.0
+
+    def status(self) -> Dict[str, int]:
+        return {
+            "active": self._active,
+            **{f"queued_{p}": len(queue) for p, queue in self._queues.items()},
+        }
+
+    def _retry_after(self, priority: str) -> float:
+        ahead = sum(
+            len(self._queues[p])
+            for p in self.priorities[: self.priorities.index(priority) + 1]
+        )
+        return max(math.ceil(self._hold_seconds * (ahead + 1) / self.limit), 1)
+
+    async def acquire(self, priority: str, deadline: Optional[Deadline] = None) -> None:
+        """
+        Take a slot, queueing if none is free. Raises AdmissionRejected when
+        the class queue is full and DeadlineExceeded if the deadline runs
+        out while queued.
+        """
+        if priority not in self._queues:
+            priority = self.priorities[-1]
+
+        if self._active < self.limit and not any(self._queues.values()):
+            self._active += 1
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self.queue_sizes[priority]:
+            metrics.inc(f"admission.{self.name}.{priority}.rejected")
+            raise AdmissionRejected(self.name, priority, self._retry_after(priority))
+
+        timeout = deadline.timeout() if deadline else None
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we gave up on it; hand it on
+                self.release()
+            else:
+                waiter.cancel()
+                queue.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise DeadlineExceeded(f"Deadline exceeded waiting for {self.name}")
+            raise
+        finally:
+            metrics.observe(
+                f"admission.{self.name}.{priority}.wait_seconds",
+                time.perf_counter() - start,
+            )
+
+    def release(self) -> None:
+        """Free a slot, passing it straight to the next waiter if any."""
+        for priority in self.priorities:
+            queue = self._queues[priority]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: str, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire(priority, deadline)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - start
+            self._hold_seconds += 0.2 * (held - self._hold_seconds)
+            self.release()
+
+
+# OpenAI calls, with premium users admitted ahead of free ones
+llm_admission = PriorityLimiter(
+    "llm",
+    limit=settings.LLM_MAX_CONCURRENCY,
+    queue_sizes={
+        "premium": settings.LLM_QUEUE_SIZE_PREMIUM,
+        "free": settings.LLM_QUEUE_SIZE_FREE,
+    },
+)
+
+metrics.register_gauge("llm_admission", llm_admission.status)
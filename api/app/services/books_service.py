@@ -1,6 +1,9 @@
-import httpx
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.concurrency import BulkheadFull
+from app.services.upstream import upstreams
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,9 +13,13 @@ class BooksService:
     def __init__(self):
         self.api_key = settings.GOOGLE_BOOKS_API_KEY
         self.base_url = "https://www.googleapis.com/books/v1"
+        self.upstream = upstreams["books"]
 
     async def search_book(
-        self, title: str, author: Optional[str] = None
+        self,
+        title: str,
+        author: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> Optional[Dict[str, Any]]:
         """Search for a book by title and author."""
         query = f"intitle:{title}"
@@ -23,27 +30,39 @@ class BooksService:
         if self.api_key:
             params["key"] = self.api_key
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.base_url}/volumes", params=params)
-                response.raise_for_status()
-                data = response.json()
+        async def request():
+            response = await self.upstream.http_client.get(
+                f"{self.base_url}/volumes", params=params
+            )
+            response.raise_for_status()
+            self.upstream.limiter.update(response.headers)
+            return response.json()
 
-                if data.get("items"):
-                    return data["items"][0]
+        try:
+            data = await self.upstream.call(
+                request, deadline=deadline, hedge=settings.HEDGE_ENABLED
+            )
+            if data.get("items"):
+                return data["items"][0]
 
+        except (CircuitOpenError, BulkheadFull):
+            logger.debug(f"Google Books unavailable, skipping search for {title}")
+        except DeadlineExceeded:
+            logger.debug(f"Out of time, skipping Google Books search for {title}")
         except Exception as e:
             logger.error(f"Error searching Google Books for {title}: {e}")
 
         return None
 
-    async def enrich_book_data(self, book_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def enrich_book_data(
+        self, book_data: Dict[str, Any], deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """Enrich AI-generated book data with Google Books information."""
         title = book_data.get("title", "")
         author = book_data.get("author", "")
 
         # Search for the book
-        google_book = await self.search_book(title, author)
+        google_book = await self.search_book(title, author, deadline)
 
         if not google_book:
             return book_data
@@ -55,6 +74,7 @@ class BooksService:
         if volume_info:
             enriched_data.update(
                 {
+                    "google_books_id": google_book.get("id"),
                     "isbn": self._extract_isbn(
                         volume_info.get("industryIdentifiers", [])
                     ),
@@ -0,0 +1,122 @@
+from collections import deque
+from typing import Deque, Tuple
+from app.core.metrics import metrics
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Failure-rate and slow-call-rate circuit breaker.
+
+    Outcomes of the last ``window_size`` calls are kept. Once at least
+    ``min_calls`` are recorded and either the failure rate or the rate of
+    calls slower than ``slow_call_seconds`` reaches its threshold, the
+    circuit opens and calls fail immediately for ``open_seconds``. It then
+    lets ``half_open_max_calls`` probe calls through: if they all succeed
+    the circuit closes, if any fails it opens again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        slow_call_seconds: float,
+        window_size: int = 20,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.open_seconds
+        ):
+            self._state = self.HALF_OPEN
+            self._probes_started = 0
+            self._probes_succeeded = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Reserve a call, raising CircuitOpenError if the circuit rejects it."""
+        state = self.state
+        if state == self.CLOSED:
+            return
+
+        if state == self.HALF_OPEN and self._probes_started < self.half_open_max_calls:
+            self._probes_started += 1
+            return
+
+        metrics.inc(f"circuit.{self.name}.rejected")
+        retry_after = max(self._opened_at + self.open_seconds - time.monotonic(), 1.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def release(self) -> None:
+        """Give back a call reserved by ``before_call`` that was abandoned."""
+        if self._state == self.HALF_OPEN and self._probes_started > 0:
+            self._probes_started -= 1
+
+    def record(self, failed: bool, duration: float) -> None:
+        """Record the outcome of a call allowed by ``before_call``."""
+        slow = duration >= self.slow_call_seconds
+
+        if self._state == self.HALF_OPEN:
+            if failed or slow:
+                self._open()
+                return
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self.half_open_max_calls:
+                logger.info(f"Circuit for {self.name} closed")
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append((failed, slow))
+        if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+            calls = len(self._outcomes)
+            failure_rate = sum(f for f, _ in self._outcomes) / calls
+            slow_rate = sum(s for _, s in self._outcomes) / calls
+            if (
+                failure_rate >= self.failure_rate_threshold
+                or slow_rate >= self.slow_call_rate_threshold
+            ):
+                self._open()
+
+    def _open(self) -> None:
+        logger.warning(f"Circuit for {self.name} opened")
+        metrics.inc(f"circuit.{self.name}.opened")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
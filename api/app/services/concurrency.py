@@ -0,0 +1,125 @@
+from collections import deque
+from typing import Deque, Optional
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.core.metrics import metrics
+import asyncio
+import time
+
+
+class BulkheadFull(Exception):
+    """Raised instead of queueing for an upstream whose queue is full."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Too many calls waiting for {name}")
+        self.name = name
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for calls to one upstream.
+
+    Latency is compared against a baseline that tracks the fastest recent
+    calls, approximating the upstream's unloaded latency. While calls come
+    back within ``latency_tolerance`` times the baseline and the limit is at
+    least half used, it grows by one per limit's worth of calls; a failure
+    or a slow call cuts it by ``backoff_ratio``, at most once per baseline
+    latency so one burst of slow calls counts as a single signal. Callers
+    over the limit wait in FIFO order, at most ``max_queue`` of them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        max_queue: Optional[int] = None,
+    ):
+        self.name = name
+        self.max_queue = max_queue
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+
+        self._limit = float(initial_limit)
+        self._inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Take a slot, waiting for one if the limit is reached. Raises
+        BulkheadFull if ``max_queue`` callers are already waiting.
+        """
+        if self._inflight < self.limit and not self._waiters:
+            self._inflight += 1
+            return
+
+        if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+            metrics.inc(f"bulkhead.{self.name}.rejected")
+            raise BulkheadFull(self.name)
+
+        timeout = deadline.timeout() if deadline else None
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise DeadlineExceeded(f"Deadline exceeded waiting for {self.name}")
+            raise
+
+    def release(self) -> None:
+        """Free a slot taken by ``acquire``, admitting waiters the limit allows."""
+        self._inflight -= 1
+        while self._waiters and self._inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._inflight += 1
+
+    def record(self, failed: bool, duration: float) -> None:
+        """Adjust the limit from the outcome of a call still holding its slot."""
+        if self._baseline is None:
+            self._baseline = duration
+
+        congested = failed or duration > self._baseline * self.latency_tolerance
+        if not failed:
+            # Drop to faster samples at once. Slower ones raise the baseline
+            # gradually, but only when they cannot be our own load: within
+            # tolerance, or already at the minimum limit.
+            if duration < self._baseline:
+                self._baseline = duration
+            elif not congested or self._limit <= self.min_limit:
+                self._baseline += 0.001 * (duration - self._baseline)
+
+        if congested:
+            now = time.monotonic()
+            if now - self._last_decrease >= self._baseline:
+                self._limit = max(self._limit * self.backoff_ratio, self.min_limit)
+                self._last_decrease = now
+                metrics.inc(f"concurrency.{self.name}.decreases")
+        elif self._inflight >= self._limit / 2:
+            self._limit = min(self._limit + 1 / self._limit, self.max_limit)
@@ -0,0 +1,48 @@
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.core.write_queue import write_queue
+from app.crud.counter import user_counter_crud
+from app.models.user import User
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CounterRepairService:
+    """Rebuild the per-user counter cache from the rows it counts."""
+
+    async def repair(self, batch_size: int = 500) -> int:
+        """Recount every user's counters, one committed batch at a time."""
+        repaired = 0
+        last_id = ""
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(User.id)
+                    .where(User.id > last_id)
+                    .order_by(User.id)
+                    .limit(batch_size)
+                )
+                user_ids = result.scalars().all()
+                if not user_ids:
+                    break
+
+            await write_queue.submit(
+                lambda s: user_counter_crud.recount(s, user_ids=user_ids)
+            )
+
+            repaired += len(user_ids)
+            last_id = user_ids[-1]
+
+        logger.info(f"Repaired counters for {repaired} users")
+        return repaired
+
+
+counter_repair_service = CounterRepairService()
+
+
+if __name__ == "__main__":
+    # python -m app.services.counter_service
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(counter_repair_service.repair())
@@ -0,0 +1,146 @@
+from typing import Any, AsyncIterator, Dict, List
+from sqlalchemy import select, cast, Text
+from app.core.database import ReadSessionLocal
+from app.models.catalog import CatalogItem
+from app.models.recommendation import (
+    Recommendation,
+    MovieRecommendation,
+    BookRecommendation,
+)
+from app.models.saved_item import SavedItem
+from app.utils.helpers import prepend_json_member, splice_json
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = [
+    "kind",
+    "id",
+    "recommendation_id",
+    "type",
+    "item_id",
+    "item_type",
+    "title",
+    "author",
+    "rating",
+    "age_rating",
+    "release_date",
+    "published_date",
+    "description",
+    "created_at",
+]
+
+
+class ExportService:
+    """Stream a user's recommendation history and saved items."""
+
+    YIELD_PER = 500
+
+    def _queries(self, user_id: str) -> List[tuple]:
+        """(kind, statement) pairs, exported in this order."""
+        recommendations = select(
+            Recommendation.id,
+            Recommendation.type,
+            Recommendation.created_at,
+        ).where(Recommendation.user_id == user_id)
+
+        movies = (
+            select(
+                MovieRecommendation.id,
+                MovieRecommendation.recommendation_id,
+                MovieRecommendation.title,
+                MovieRecommendation.rating,
+                MovieRecommendation.age_rating,
+                MovieRecommendation.release_date,
+                MovieRecommendation.runtime,
+                MovieRecommendation.poster_path,
+                MovieRecommendation.description,
+                MovieRecommendation.created_at,
+            )
+            .join(Recommendation)
+            .where(Recommendation.user_id == user_id)
+        )
+
+        books = (
+            select(
+                BookRecommendation.id,
+                BookRecommendation.recommendation_id,
+                BookRecommendation.title,
+                BookRecommendation.author,
+                BookRecommendation.rating,
+                BookRecommendation.age_rating,
+                BookRecommendation.published_date,
+                BookRecommendation.page_count,
+                BookRecommendation.publisher,
+                BookRecommendation.poster_path,
+                BookRecommendation.description,
+                BookRecommendation.created_at,
+            )
+            .join(Recommendation)
+            .where(Recommendation.user_id == user_id)
+        )
+
+        saved_items = (
+            select(
+                SavedItem.id,
+                SavedItem.item_id,
+                SavedItem.item_type,
+                SavedItem.item_title.label("title"),
+                SavedItem.created_at,
+                cast(CatalogItem.data, Text).label("item_data"),
+            )
+            .join(CatalogItem, CatalogItem.id == SavedItem.catalog_item_id)
+            .where(SavedItem.user_id == user_id)
+        )
+
+        return [
+            ("recommendation", recommendations.order_by(Recommendation.created_at)),
+            ("movie", movies.order_by(MovieRecommendation.created_at)),
+            ("book", books.order_by(BookRecommendation.created_at)),
+            ("saved_item", saved_items.order_by(SavedItem.created_at)),
+        ]
+
+    async def _rows(self, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every exported row using server-side cursors."""
+        async with ReadSessionLocal() as db:
+            for kind, statement in self._queries(user_id):
+                result = await db.stream(
+                    statement.execution_options(yield_per=self.YIELD_PER)
+                )
+                async for row in result.mappings():
+                    yield {"kind": kind, **row}
+
+    async def ndjson(self, user_id: str) -> AsyncIterator[str]:
+        """Export as one JSON object per line."""
+        async for row in self._rows(user_id):
+            # Saved item data is already JSON text; pass it through as is,
+            # with the item ID added as the saved items endpoint does
+            raw = {}
+            if "item_data" in row:
+                raw["item_data"] = prepend_json_member(
+                    row.pop("item_data"), "id", row["item_id"]
+                )
+            yield splice_json(row, raw) + "\n"
+
+    async def csv(self, user_id: str) -> AsyncIterator[str]:
+        """Export as a single CSV table with a ``kind`` column."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+
+        writer.writeheader()
+        yield buffer.getvalue()
+
+        async for row in self._rows(user_id):
+            if "item_data" in row:
+                # Fill author, description and the like from the catalog data
+                row = {**json.loads(row.pop("item_data")), **row}
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue()
+
+
+export_service = ExportService()
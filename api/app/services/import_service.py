@@ -0,0 +1,231 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import UploadFile
+from app.core.config import settings
+from app.core.database import record_write
+from app.core.write_queue import write_queue
+from app.crud.catalog import catalog_key
+from app.crud.saved_item import saved_item_crud
+from app.schemas.saved_item import SavedItemCreate
+from app.services.tmdb_service import tmdb_service
+from app.services.books_service import books_service
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Column names used by Letterboxd and Goodreads exports, plus our own JSONL keys
+TITLE_FIELDS = ("title", "Title", "Name", "name")
+YEAR_FIELDS = ("year", "Year", "Year Published", "Original Publication Year")
+AUTHOR_FIELDS = ("author", "Author")
+TYPE_FIELDS = ("item_type", "type")
+
+
+def _first(record: Dict[str, Any], fields: tuple) -> Optional[str]:
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+class SavedItemsImportService:
+    """Stream a watchlist export into a user's saved items."""
+
+    async def _read_lines(self, file: UploadFile) -> AsyncIterator[str]:
+        """Yield decoded lines from the upload without reading it all at once."""
+        buffer = ""
+        first_chunk = True
+        while True:
+            chunk = await file.read(64 * 1024)
+            if not chunk:
+                break
+            text = chunk.decode("utf-8", errors="replace")
+            if first_chunk:
+                text = text.lstrip("\ufeff")
+                first_chunk = False
+            buffer += text
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+        if buffer:
+            yield buffer.rstrip("\r")
+
+    async def _read_records(
+        self, file: UploadFile, file_format: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Parse CSV (with a header row) or JSONL records incrementally."""
+        if file_format == "jsonl":
+            async for line in self._read_lines(file):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    yield {}
+                    continue
+                yield record if isinstance(record, dict) else {}
+            return
+
+        header = None
+        pending = ""
+        async for line in self._read_lines(file):
+            pending = f"{pending}\n{line}" if pending else line
+            # Quoted fields may span lines; wait until the quotes balance
+            if pending.count('"') % 2:
+                continue
+            row = next(csv.reader([pending]), [])
+            pending = ""
+            if header is None:
+                header = row
+                continue
+            if any(row):
+                yield dict(zip(header, row))
+
+    def _to_request(
+        self, record: Dict[str, Any], default_type: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        title = _first(record, TITLE_FIELDS)
+        if not title:
+            return None
+
+        author = _first(record, AUTHOR_FIELDS)
+        item_type = _first(record, TYPE_FIELDS) or default_type
+        if item_type not in ("movie", "book"):
+            item_type = "book" if author else "movie"
+
+        year = _first(record, YEAR_FIELDS)
+        return {
+            "item_type": item_type,
+            "title": title,
+            "author": author,
+            "year": int(year[:4]) if year and year[:4].isdigit() else None,
+        }
+
+    async def _resolve(self, request: Dict[str, Any]) -> SavedItemCreate:
+        """Look the title up upstream; fall back to the imported fields."""
+        title = request["title"]
+        if request["item_type"] == "movie":
+            data: Dict[str, Any] = {
+                "title": title,
+                "release_date": str(request["year"]) if request["year"] else None,
+                "genres": [],
+            }
+            movie = await tmdb_service.search_movie(title, request["year"])
+            if movie:
+                data.update(
+                    title=movie.get("title") or title,
+                    rating=movie.get("vote_average"),
+                    description=movie.get("overview"),
+                    poster_path=(
+                        f"{tmdb_service.image_base_url}{movie['poster_path']}"
+                        if movie.get("poster_path")
+                        else None
+                    ),
+                    release_date=movie.get("release_date") or data["release_date"],
+                )
+                item_id = f"tmdb:{movie['id']}"
+            else:
+                item_id = None
+        else:
+            data = {"title": title, "author": request["author"] or "Unknown Author", "genres": []}
+            book = await books_service.search_book(title, request["author"])
+            volume_info = (book or {}).get("volumeInfo", {})
+            if volume_info:
+                data.update(
+                    title=volume_info.get("title") or title,
+                    author=", ".join(volume_info.get("authors", [])) or data["author"],
+                    rating=volume_info.get("averageRating"),
+                    description=volume_info.get("description"),
+                    poster_path=volume_info.get("imageLinks", {}).get("thumbnail"),
+                    published_date=volume_info.get("publishedDate"),
+                    page_count=volume_info.get("pageCount"),
+                    publisher=volume_info.get("publisher"),
+                )
+                item_id = f"gbooks:{book['id']}"
+            else:
+                item_id = None
+
+        if item_id is None:
+            digest = hashlib.sha1(
+                catalog_key(request["item_type"], title, data).encode()
+            ).hexdigest()[:16]
+            item_id = f"import:{digest}"
+
+        return SavedItemCreate(
+            item_id=item_id,
+            item_type=request["item_type"],
+            item_title=data["title"],
+            item_data=data,
+        )
+
+    async def _import_batch(
+        self, user_id: str, batch: List[Dict[str, Any]], semaphore: asyncio.Semaphore
+    ) -> int:
+        async def resolve(request):
+            async with semaphore:
+                return await self._resolve(request)
+
+        items = await asyncio.gather(*(resolve(request) for request in batch))
+
+        imported = await write_queue.submit(
+            lambda s: saved_item_crud.create_many_for_user(
+                s, user_id=user_id, items=items
+            )
+        )
+        record_write(user_id)
+        return imported
+
+    async def run(
+        self,
+        user_id: str,
+        file: UploadFile,
+        file_format: str,
+        item_type: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Import the upload and yield NDJSON progress lines, one per batch,
+        followed by a final summary.
+        """
+        semaphore = asyncio.Semaphore(settings.IMPORT_CONCURRENCY)
+        progress = {"processed": 0, "imported": 0, "skipped": 0, "truncated": False}
+        batch: List[Dict[str, Any]] = []
+
+        async def flush():
+            progress["imported"] += await self._import_batch(user_id, batch, semaphore)
+            progress["processed"] += len(batch)
+            batch.clear()
+            return json.dumps(progress) + "\n"
+
+        try:
+            async for record in self._read_records(file, file_format):
+                if progress["processed"] + len(batch) >= settings.IMPORT_MAX_ITEMS:
+                    progress["truncated"] = True
+                    break
+
+                request = self._to_request(record, item_type)
+                if request is None:
+                    progress["skipped"] += 1
+                    continue
+
+                batch.append(request)
+                if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                    yield await flush()
+
+            if batch:
+                yield await flush()
+        except Exception as e:
+            logger.error(f"Saved items import failed for user {user_id}: {e}")
+            yield json.dumps({**progress, "done": True, "error": "Import failed"}) + "\n"
+            return
+
+        # Rows already saved, under the same item ID or as the same catalog
+        # title, are the only processed rows left out of a batch
+        progress["duplicates"] = progress["processed"] - progress["imported"]
+        logger.info(f"Imported saved items for user {user_id}: {progress}")
+        yield json.dumps({**progress, "done": True}) + "\n"
+
+
+import_service = SavedItemsImportService()
@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.admission import tier_priority
+import time
+
+QUESTIONS = "questions"
+RECOMMENDATIONS = "recommendations"
+
+
+def _models(value: str) -> List[str]:
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+
+class ModelStats:
+    """Moving averages of one model's latency and error rate for one operation."""
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.failed_at = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.error_rate < settings.MODEL_ROUTER_ERROR_RATE_THRESHOLD
+            or time.monotonic() - self.failed_at >= settings.MODEL_ROUTER_COOLDOWN_SECONDS
+        )
+
+    def record(self, failed: bool, duration: Optional[float]) -> None:
+        alpha = settings.MODEL_ROUTER_EWMA_ALPHA
+        self.error_rate += alpha * (float(failed) - self.error_rate)
+        if failed:
+            self.failed_at = time.monotonic()
+        elif duration is not None:
+            self.latency = (
+                duration
+                if self.latency is None
+                else self.latency + alpha * (duration - self.latency)
+            )
+
+
+class ModelRouter:
+    """
+    Choose the OpenAI model for each call.
+
+    Every (operation, tier) pair has a list of models good enough for it,
+    in order of preference. Calls go to the fastest healthy model on the
+    list, by recent latency for that operation; models not tried yet come
+    first so each gets measured, and unhealthy ones are only used as a
+    last resort until their cooldown passes.
+    """
+
+    def __init__(self, routes: Dict[Tuple[str, str], List[str]]):
+        self.routes = routes
+        self._stats: Dict[Tuple[str, str], ModelStats] = {}
+
+    def _stats_for(self, operation: str, model: str) -> ModelStats:
+        key = (operation, model)
+        if key not in self._stats:
+            self._stats[key] = ModelStats()
+        return self._stats[key]
+
+    def route(self, operation: str, tier: str) -> List[str]:
+        """Models to try for a call, best first, counting the first as selected."""
+        models = self.routes[(operation, tier_priority(tier))]
+
+        def rank(model: str) -> Tuple[bool, float]:
+            stats = self._stats_for(operation, model)
+            return (not stats.healthy, stats.latency or 0.0)
+
+        ranked = sorted(models, key=rank)
+        metrics.inc(f"model_router.{operation}.{ranked[0]}.selected")
+        return ranked
+
+    def record(
+        self,
+        operation: str,
+        model: str,
+        *,
+        failed: bool,
+        duration: Optional[float] = None,
+        fallback: bool = False,
+    ) -> None:
+        """Record the outcome of a call routed to ``model``."""
+        self._stats_for(operation, model).record(failed, duration)
+        metrics.inc(f"model_router.{operation}.{model}.{'failed' if failed else 'served'}")
+        if fallback:
+            metrics.inc(f"model_router.{operation}.{model}.fallbacks")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f"{operation}:{model}": {
+                "latency": round(stats.latency, 3) if stats.latency is not None else None,
+                "error_rate": round(stats.error_rate, 3),
+                "healthy": stats.healthy,
+            }
+            for (operation, model), stats in self._stats.items()
+        }
+
+
+model_router = ModelRouter(
+    {
+        (QUESTIONS, "free"): _models(settings.OPENAI_QUESTION_MODELS_FREE),
+        (QUESTIONS, "premium"): _models(settings.OPENAI_QUESTION_MODELS_PREMIUM),
+        (RECOMMENDATIONS, "free"): _models(settings.OPENAI_RECOMMENDATION_MODELS_FREE),
+        (RECOMMENDATIONS, "premium"): _models(
+            settings.OPENAI_RECOMMENDATION_MODELS_PREMIUM
+        ),
+    }
+)
+
+metrics.register_gauge("model_router", model_router.status)
@@ -0,0 +1,143 @@
+from typing import Any, Collection, Dict, List, Mapping, Optional, Tuple
+from openai import AsyncOpenAI
+from app.core.metrics import metrics
+from app.services.rate_limit import parse_reset
+from app.services.retry import retry_after_seconds
+import httpx
+import logging
+import openai
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PooledKey:
+    """
+    One OpenAI key (and optional organization) with its own client and the
+    rate-limit state its latest responses reported. Keys are only ever
+    referred to by ``label`` in logs and metrics.
+    """
+
+    def __init__(self, label: str, client: AsyncOpenAI):
+        self.label = label
+        self.client = client
+        self.blocked_until = 0.0
+        self._limits: Dict[str, float] = {}
+        self._remaining: Dict[str, float] = {}
+
+    @property
+    def blocked(self) -> bool:
+        return time.monotonic() < self.blocked_until
+
+    def headroom(self) -> float:
+        """Smallest fraction of the request and token quotas left; 1.0 if unknown."""
+        if self.blocked:
+            return 0.0
+        fractions = [
+            self._remaining[quota] / self._limits[quota]
+            for quota in self._remaining
+            if self._limits.get(quota)
+        ]
+        return max(min(fractions, default=1.0), 0.0)
+
+    def reserve(self) -> None:
+        """Count a request against the key before its headers come back."""
+        if "requests" in self._remaining:
+            self._remaining["requests"] -= 1
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Take in the quota reported in a response's rate-limit headers."""
+        for quota in ("requests", "tokens"):
+            try:
+                limit = headers.get(f"x-ratelimit-limit-{quota}")
+                remaining = headers.get(f"x-ratelimit-remaining-{quota}")
+                if limit is not None:
+                    self._limits[quota] = float(limit)
+                if remaining is not None:
+                    self._remaining[quota] = float(remaining)
+            except ValueError:
+                continue
+            if remaining is not None and self._remaining[quota] < 1:
+                reset = parse_reset(headers.get(f"x-ratelimit-reset-{quota}"))
+                self.block(reset or 1.0)
+
+
+class OpenAIKeyPool:
+    """
+    Spread chat completions over several OpenAI keys. Each request goes to
+    the key with the most quota left; a key that answers 429 is set aside
+    until its quota resets and the request moves on to the next one.
+    """
+
+    def __init__(
+        self,
+        keys: List[Tuple[str, Optional[str]]],
+        *,
+        http_client: httpx.AsyncClient,
+        timeout: float,
+        max_retries: int,
+    ):
+        self.keys = [
+            PooledKey(
+                f"key{index}",
+                AsyncOpenAI(
+                    api_key=api_key,
+                    organization=organization,
+                    timeout=timeout,
+                    max_retries=max_retries,
+                    http_client=http_client,
+                ),
+            )
+            for index, (api_key, organization) in enumerate(keys)
+        ]
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key.label: {"headroom": round(key.headroom(), 3), "blocked": key.blocked}
+            for key in self.keys
+        }
+
+    def pick(self, exclude: Collection[PooledKey] = ()) -> Optional[PooledKey]:
+        """
+        The available key with the most headroom. If every key is set
+        aside, the first attempt still goes to the one that frees up
+        soonest; later attempts give up.
+        """
+        candidates = [key for key in self.keys if key not in exclude]
+        available = [key for key in candidates if not key.blocked]
+        if available:
+            return max(available, key=lambda key: key.headroom())
+        if candidates and not exclude:
+            return min(candidates, key=lambda key: key.blocked_until)
+        return None
+
+    async def create(self, **kwargs: Any) -> Any:
+        """Create a chat completion, returning the raw response."""
+        tried: List[PooledKey] = []
+        last_error: Optional[Exception] = None
+        while True:
+            key = self.pick(tried)
+            if key is None:
+                if last_error is None:
+                    raise RuntimeError("No OpenAI API keys configured")
+                # Every key is rate limited; leave backing off to the caller
+                raise last_error
+            tried.append(key)
+            key.reserve()
+            metrics.inc(f"openai_keys.{key.label}.requests")
+            try:
+                raw = await key.client.chat.completions.with_raw_response.create(
+                    **kwargs
+                )
+            except openai.RateLimitError as e:
+                metrics.inc(f"openai_keys.{key.label}.rate_limited")
+                key.update(e.response.headers)
+                key.block(retry_after_seconds(e) or 1.0)
+                logger.warning(f"OpenAI {key.label} rate limited, failing over")
+                last_error = e
+                continue
+            key.update(raw.headers)
+            return raw
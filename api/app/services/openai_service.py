@@ -1,41 +1,107 @@
 # api/app/services/openai_service.py - DEBUG VERSION
 # Replace your openai_service.py with this temporarily to see what's happening
 
-from typing import List, Dict, Any
-from openai import AsyncOpenAI
+from typing import List, Dict, Any, Optional
 from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.core.metrics import metrics
 from app.schemas.recommendation import RecommendationType
+from app.services.admission import AdmissionRejected, llm_admission, tier_priority
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.concurrency import BulkheadFull
+from app.services.model_router import QUESTIONS, RECOMMENDATIONS, model_router
+from app.services.openai_pool import OpenAIKeyPool
+from app.services.retry import is_retryable
+from app.services.upstream import upstreams
 import json
 import logging
+import openai
+import time
 
 logger = logging.getLogger(__name__)
 
 
 class OpenAIService:
     def __init__(self):
-        if not settings.OPENAI_API_KEY:
+        if not settings.openai_keys:
             raise ValueError("OPENAI_API_KEY is required for AI recommendations.")
 
         if not settings.validate_openai_key():
             raise ValueError(f"Invalid OPENAI_API_KEY format.")
 
         try:
-            self.client = AsyncOpenAI(
-                api_key=settings.OPENAI_API_KEY,
-                timeout=60.0,
-                max_retries=3,
+            self.upstream = upstreams["openai"]
+            self.keys = OpenAIKeyPool(
+                settings.openai_keys,
+                http_client=self.upstream.http_client,
+                timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                max_retries=settings.OPENAI_MAX_RETRIES,
+            )
+            metrics.register_gauge("openai_keys", self.keys.status)
+            logger.info(
+                f"✅ OpenAI service initialized successfully with {len(self.keys.keys)} key(s)"
             )
-            logger.info("✅ OpenAI service initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize OpenAI client: {e}")
             raise
 
+    async def _complete(
+        self, deadline: Optional[Deadline], tier: str, operation: str, **kwargs: Any
+    ) -> Any:
+        """
+        Create a chat completion once admitted for the user's tier, on the
+        pooled key with the most headroom and the model the router picks.
+        Each model is its own partition of the OpenAI upstream, so one
+        model's failures only open that model's circuit. If that model
+        fails or is unavailable, the next one is tried; only the last is
+        retried under the shared retry policy.
+        """
+        async with llm_admission.slot(tier_priority(tier), deadline):
+            models = model_router.route(operation, tier)
+            for index, model in enumerate(models):
+                last = index == len(models) - 1
+
+                async def request():
+                    raw = await self.keys.create(model=model, **kwargs)
+                    return raw.parse()
+
+                start = time.perf_counter()
+                try:
+                    response = await self.upstream.partition(model).call(
+                        request, deadline=deadline, retry=last
+                    )
+                except (CircuitOpenError, BulkheadFull) as e:
+                    if last:
+                        raise
+                    logger.warning(f"⚠️ {model} unavailable for {operation}, falling back: {e}")
+                    continue
+                except Exception as e:
+                    if not (is_retryable(e) or isinstance(e, openai.NotFoundError)):
+                        raise
+                    model_router.record(
+                        operation, model, failed=True, fallback=index > 0
+                    )
+                    if last:
+                        raise
+                    logger.warning(f"⚠️ {model} failed for {operation}, falling back: {e}")
+                    continue
+                model_router.record(
+                    operation,
+                    model,
+                    failed=False,
+                    duration=time.perf_counter() - start,
+                    fallback=index > 0,
+                )
+                return response
+
     async def generate_questions(
         self,
         recommendation_type: RecommendationType,
         num_questions: int,
         user_age: int = None,
         accessibility_needs: Dict = None,
+        deadline: Optional[Deadline] = None,
+        tier: str = "free",
     ) -> List[Dict[str, Any]]:
         """Generate personalized questions for recommendations."""
 
@@ -62,8 +128,10 @@ Return ONLY a JSON object with a "questions" array:
 Generate exactly {num_questions} questions."""
 
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._complete(
+                deadline,
+                tier,
+                QUESTIONS,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
@@ -92,6 +160,8 @@ Generate exactly {num_questions} questions."""
             logger.info(f"✅ Generated {len(questions)} questions")
             return questions
 
+        except (DeadlineExceeded, AdmissionRejected):
+            raise
         except Exception as e:
             logger.error(f"❌ Question generation failed: {e}")
             raise Exception(f"Failed to generate questions: {str(e)}")
@@ -102,6 +172,8 @@ Generate exactly {num_questions} questions."""
         questions_and_answers: List[Dict[str, str]],
         user_age: int = None,
         accessibility_needs: Dict = None,
+        deadline: Optional[Deadline] = None,
+        tier: str = "free",
     ) -> Dict[str, Any]:
         """Generate recommendations - DEBUG VERSION to see what's happening."""
 
@@ -169,8 +241,10 @@ Recommend {target}."""
             logger.info(f"🔍 DEBUG: System prompt length: {len(system_prompt)}")
             logger.info(f"🔍 DEBUG: User prompt length: {len(user_prompt)}")
 
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._complete(
+                deadline,
+                tier,
+                RECOMMENDATIONS,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
@@ -233,6 +307,8 @@ Recommend {target}."""
                 logger.error(f"❌ DEBUG: Raw content that failed: {content}")
                 raise Exception("OpenAI returned invalid JSON")
 
+        except (DeadlineExceeded, AdmissionRejected):
+            raise
         except Exception as e:
             logger.error(f"❌ DEBUG: Recommendation generation failed: {e}")
             import traceback
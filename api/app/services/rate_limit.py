@@ -0,0 +1,130 @@
+from typing import Mapping, Optional
+from app.core.deadline import Deadline, DeadlineExceeded
+import asyncio
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rate-limit header families: plain (TMDB and most APIs) and OpenAI's
+# separate request and token quotas
+QUOTAS = ("", "-requests", "-tokens")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds until a quota resets, from a reset header: plain seconds, an
+    epoch timestamp, or an OpenAI-style duration such as ``6m0s``.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        parts = _DURATION_PART.findall(value)
+        if not parts:
+            return None
+        seconds = sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+    else:
+        if seconds > 1e9:
+            seconds -= time.time()
+    return max(seconds, 0.0)
+
+
+class RateLimiter:
+    """
+    Token bucket that paces calls to an upstream.
+
+    The bucket refills at ``rate`` calls per second up to ``burst``; a rate
+    of 0 leaves calls unpaced. Responses feed back through ``update``: the
+    bucket never holds more than the upstream says remains, and an
+    exhausted quota or a ``Retry-After`` holds every call until it resets.
+    Callers that cannot proceed wait in FIFO order instead of failing.
+    """
+
+    def __init__(self, name: str, *, rate: float, burst: Optional[float] = None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst or max(rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self.rate, self.burst
+            )
+        else:
+            self._tokens = self.burst
+        self._updated = now
+
+    def _wait_time(self) -> float:
+        """Seconds until a call may start, taking a token if it may start now."""
+        now = time.monotonic()
+        self._refill(now)
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Wait for a slot, queueing behind earlier callers. Raises
+        DeadlineExceeded rather than waiting past ``deadline``.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        self._waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    wait = self._wait_time()
+                    if not wait:
+                        return
+                    if deadline is not None and not deadline.has(wait):
+                        raise DeadlineExceeded(
+                            f"Deadline exceeded waiting for {self.name} rate limit"
+                        )
+                    await asyncio.sleep(wait)
+        finally:
+            self._waiting -= 1
+
+    def update(
+        self, headers: Mapping[str, str], retry_after: Optional[float] = None
+    ) -> None:
+        """Adjust to the quota an upstream reported in its response headers."""
+        now = time.monotonic()
+        self._refill(now)
+        blocked_for = retry_after or 0.0
+
+        for quota in QUOTAS:
+            remaining = headers.get(f"x-ratelimit-remaining{quota}")
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            if quota != "-tokens":
+                self._tokens = min(self._tokens, remaining)
+            if remaining < 1:
+                reset = parse_reset(headers.get(f"x-ratelimit-reset{quota}"))
+                blocked_for = max(blocked_for, reset or 1.0)
+
+        if blocked_for and now + blocked_for > self._blocked_until:
+            logger.info(f"{self.name} rate limit reached, pausing for {blocked_for:.1f}s")
+            self._blocked_until = now + blocked_for
@@ -9,10 +9,21 @@ from app.models.recommendation import (
     RecommendationAnswer,
     MovieRecommendation,
     BookRecommendation,
+    movie_genres,
+    book_genres,
 )
 from app.models.user import User
 from app.models.preferences import UserPreferences
 from app.schemas.recommendation import RecommendationType, Answer
+from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.core.metrics import metrics
+from app.core.write_queue import write_queue
+from app.crud.catalog import catalog_item_crud
+from app.crud.genre import genre_crud, normalize_genre
+from app.crud.counter import user_counter_crud, RECOMMENDATIONS
+from app.crud.sync import user_change_crud
+from app.services.admission import AdmissionRejected
 from app.services.openai_service import openai_service
 from app.services.tmdb_service import tmdb_service
 from app.services.books_service import books_service
@@ -23,7 +34,48 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# Fields TMDB and Google Books are the source of truth for. Only these may
+# refresh the shared catalog; descriptions and the like are model output
+# written for one request.
+TMDB_CATALOG_FIELDS = ("tmdb_id", "poster_path", "release_date", "rating", "runtime")
+BOOKS_CATALOG_FIELDS = (
+    "google_books_id",
+    "isbn",
+    "poster_path",
+    "published_date",
+    "page_count",
+    "publisher",
+    "rating",
+)
+
+
+def _canonical(enriched: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+    return {field: enriched[field] for field in fields if enriched.get(field) is not None}
+
+
+def _genres(item_data: Dict[str, Any]) -> List[str]:
+    """Normalized, de-duplicated genre names from an AI recommendation."""
+    genres = item_data.get("genres") or []
+    if not isinstance(genres, list):
+        return []
+
+    names = []
+    for genre in genres:
+        name = normalize_genre(genre) if isinstance(genre, str) else ""
+        if name and len(name) <= 50 and name not in names:
+            names.append(name)
+    return names[:10]
+
+
 class RecommendationService:
+    @staticmethod
+    def _can_enrich(deadline: Optional[Deadline]) -> bool:
+        """Whether there is time left to enrich; otherwise save titles as is."""
+        if deadline is None or deadline.has(settings.ENRICHMENT_MIN_BUDGET_SECONDS):
+            return True
+        metrics.inc("recommendations.enrichment_skipped")
+        return False
+
     async def get_user_preferences(
         self, db: AsyncSession, user: User
     ) -> Optional[UserPreferences]:
@@ -43,6 +95,8 @@ class RecommendationService:
         user: User,
         recommendation_type: RecommendationType,
         num_questions: int,
+        deadline: Optional[Deadline] = None,
+        tier: str = "free",
     ) -> Recommendation:
         """Generate questions for a recommendation session."""
         logger.info(f"🎯 Generating {num_questions} questions for {recommendation_type.value}")
@@ -65,6 +119,8 @@ class RecommendationService:
                 num_questions=num_questions,
                 user_age=user.age,
                 accessibility_needs=accessibility_needs,
+                deadline=deadline,
+                tier=tier,
             )
 
             if not questions_data:
@@ -77,20 +133,28 @@ class RecommendationService:
                 type=recommendation_type.value,
                 timestamp=datetime.utcnow(),
             )
-            db.add(recommendation)
-            await db.flush()
-
-            # Save questions to database
-            for question_data in questions_data:
-                question = RecommendationQuestion(
+            questions = [
+                RecommendationQuestion(
                     id=str(uuid.uuid4()),
                     recommendation_id=recommendation.id,
                     question_text=question_data["text"],
                     question_order=question_data["order"],
                 )
-                db.add(question)
+                for question_data in questions_data
+            ]
+
+            async def save(s: AsyncSession) -> None:
+                s.add(recommendation)
+                await s.flush()
+                s.add_all(questions)
+                await user_change_crud.record(
+                    s, user_id=user.id, entity="recommendation", entity_ids=[recommendation.id]
+                )
+                await user_counter_crud.increment(
+                    s, user_id=user.id, deltas={RECOMMENDATIONS: 1}
+                )
 
-            await db.commit()
+            await write_queue.write(db, save)
 
             # Reload with questions
             result = await db.execute(
@@ -103,28 +167,37 @@ class RecommendationService:
             logger.info(f"✅ Generated {len(recommendation.questions)} real questions")
             return recommendation
 
+        except (DeadlineExceeded, AdmissionRejected):
+            await db.rollback()
+            raise
         except Exception as e:
             logger.error(f"❌ Question generation failed: {e}")
             await db.rollback()
             raise Exception(f"Failed to generate questions: {str(e)}")
 
     async def process_answers(
-        self, db: AsyncSession, recommendation: Recommendation, answers: List[Answer]
+        self,
+        db: AsyncSession,
+        recommendation: Recommendation,
+        answers: List[Answer],
+        deadline: Optional[Deadline] = None,
+        tier: str = "free",
     ) -> Recommendation:
         """Process user answers and generate REAL recommendations."""
         logger.info(f"🔄 Processing answers for REAL recommendations")
 
         try:
-            # Save answers to database
-            for answer in answers:
-                db_answer = RecommendationAnswer(
+            # Rows are collected here and written in one transaction at the
+            # end, so no write is held open across the upstream calls
+            new_rows = [
+                RecommendationAnswer(
                     id=str(uuid.uuid4()),
                     question_id=answer.question_id,
                     answer_text=answer.answer_text,
                 )
-                db.add(db_answer)
-
-            await db.flush()
+                for answer in answers
+            ]
+            catalog_refreshes = []
 
             # Get user data
             result = await db.execute(select(User).where(User.id == recommendation.user_id))
@@ -166,6 +239,8 @@ class RecommendationService:
                 questions_and_answers=questions_and_answers,
                 user_age=user.age,
                 accessibility_needs=accessibility_needs,
+                deadline=deadline,
+                tier=tier,
             )
 
             if not ai_recommendations:
@@ -175,6 +250,7 @@ class RecommendationService:
 
             # Process movies (if any)
             movies_saved = 0
+            movie_genre_rows = []
             if "movies" in ai_recommendations and ai_recommendations["movies"]:
                 for movie_data in ai_recommendations["movies"]:
                     if not movie_data.get("title"):
@@ -200,10 +276,19 @@ class RecommendationService:
                             except (ValueError, TypeError):
                                 pass
 
+                        genres = _genres(movie_data)
+
                         # Enrich with TMDB data (optional, non-blocking)
+                        enriched_movie = None
                         try:
-                            enriched_movie = await tmdb_service.enrich_movie_data(movie_data)
+                            enriched_movie = (
+                                await tmdb_service.enrich_movie_data(movie_data, deadline)
+                                if self._can_enrich(deadline)
+                                else None
+                            )
                             if enriched_movie:
+                                # TMDB's genres are canonical; prefer them to the AI's
+                                genres = _genres(enriched_movie) or genres
                                 if enriched_movie.get("poster_path"):
                                     movie_rec_data["poster_path"] = str(enriched_movie["poster_path"])
                                 if enriched_movie.get("tmdb_id"):
@@ -228,7 +313,23 @@ class RecommendationService:
                             recommendation_id=recommendation.id,
                             **movie_rec_data
                         )
-                        db.add(movie_rec)
+                        new_rows.append(movie_rec)
+                        movie_genre_rows.extend((movie_rec.id, genre) for genre in genres)
+
+                        # Refresh the shared catalog entry, if anyone saved
+                        # it, with what TMDB says about the title
+                        if enriched_movie and enriched_movie.get("tmdb_id"):
+                            fields = _canonical(enriched_movie, TMDB_CATALOG_FIELDS)
+                            if _genres(enriched_movie):
+                                fields["genres"] = _genres(enriched_movie)
+                            catalog_refreshes.append(
+                                {
+                                    "item_type": "movie",
+                                    "title": movie_rec_data["title"],
+                                    "data": movie_rec_data,
+                                    "fields": fields,
+                                }
+                            )
                         movies_saved += 1
                         logger.info(f"💾 Saved movie: {movie_rec_data['title']}")
 
@@ -237,6 +338,7 @@ class RecommendationService:
 
             # Process books (if any)
             books_saved = 0
+            book_genre_rows = []
             if "books" in ai_recommendations and ai_recommendations["books"]:
                 for book_data in ai_recommendations["books"]:
                     if not book_data.get("title"):
@@ -265,8 +367,13 @@ class RecommendationService:
                                 pass
 
                         # Enrich with Google Books data (optional, non-blocking)
+                        enriched_book = None
                         try:
-                            enriched_book = await books_service.enrich_book_data(book_data)
+                            enriched_book = (
+                                await books_service.enrich_book_data(book_data, deadline)
+                                if self._can_enrich(deadline)
+                                else None
+                            )
                             if enriched_book:
                                 if enriched_book.get("poster_path"):
                                     book_rec_data["poster_path"] = str(enriched_book["poster_path"])
@@ -291,7 +398,21 @@ class RecommendationService:
                             recommendation_id=recommendation.id,
                             **book_rec_data
                         )
-                        db.add(book_rec)
+                        new_rows.append(book_rec)
+                        genres = _genres(book_data)
+                        book_genre_rows.extend((book_rec.id, genre) for genre in genres)
+
+                        # Refresh the shared catalog entry, if anyone saved
+                        # it, with what Google Books says about the title
+                        if enriched_book and enriched_book.get("google_books_id"):
+                            catalog_refreshes.append(
+                                {
+                                    "item_type": "book",
+                                    "title": book_rec_data["title"],
+                                    "data": book_rec_data,
+                                    "fields": _canonical(enriched_book, BOOKS_CATALOG_FIELDS),
+                                }
+                            )
                         books_saved += 1
                         logger.info(f"💾 Saved book: {book_rec_data['title']} by {book_rec_data['author']}")
 
@@ -304,8 +425,25 @@ class RecommendationService:
             if total_saved == 0:
                 raise Exception("No recommendations could be saved to database")
 
+            async def save(s: AsyncSession) -> None:
+                s.add_all(new_rows)
+                # Store genres in bulk once the recommendations they belong to exist
+                await s.flush()
+                await genre_crud.link(s, association=movie_genres, rows=movie_genre_rows)
+                await genre_crud.link(s, association=book_genres, rows=book_genre_rows)
+
+                for refresh in catalog_refreshes:
+                    await catalog_item_crud.refresh(s, **refresh)
+
+                await user_change_crud.record(
+                    s,
+                    user_id=recommendation.user_id,
+                    entity="recommendation",
+                    entity_ids=[recommendation.id],
+                )
+
             # Commit all changes
-            await db.commit()
+            await write_queue.write(db, save)
             logger.info(f"✅ Successfully committed {total_saved} real recommendations")
 
             # Return fresh data
@@ -316,9 +454,14 @@ class RecommendationService:
                     selectinload(Recommendation.questions).selectinload(
                         RecommendationQuestion.answers
                     ),
-                    selectinload(Recommendation.movie_recommendations),
-                    selectinload(Recommendation.book_recommendations),
+                    selectinload(Recommendation.movie_recommendations).selectinload(
+                        MovieRecommendation.genres
+                    ),
+                    selectinload(Recommendation.book_recommendations).selectinload(
+                        BookRecommendation.genres
+                    ),
                 )
+                .execution_options(populate_existing=True)
             )
             final_recommendation = result.scalar_one()
 
@@ -328,6 +471,9 @@ class RecommendationService:
             logger.info(f"🎉 Final result: {final_movies} movies, {final_books} books - ALL REAL DATA")
             return final_recommendation
 
+        except (DeadlineExceeded, AdmissionRejected):
+            await db.rollback()
+            raise
         except Exception as e:
             logger.error(f"❌ Failed to process real recommendations: {e}")
             await db.rollback()
@@ -0,0 +1,170 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+from tenacity import RetryCallState
+from tenacity.retry import retry_base
+from tenacity.wait import wait_base, wait_random_exponential
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.metrics import metrics
+import asyncio
+import httpx
+import openai
+import stripe
+
+
+class RetryBudget:
+    """
+    Token bucket that caps retries at a fraction of calls.
+
+    Every call deposits ``ratio`` tokens and every retry spends one, so
+    across the process retries stay at or below ``ratio`` of calls. The
+    bucket starts full and holds at most ``max_tokens``, which lets a quiet
+    process retry an occasional failure without having earned it first.
+    """
+
+    def __init__(self, name: str, *, ratio: float, max_tokens: float):
+        self.name = name
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        """Credit the budget for one call."""
+        self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        """Spend one token, returning False when the budget is exhausted."""
+        if self._tokens < 1:
+            metrics.inc(f"{self.name}.exhausted")
+            return False
+        self._tokens -= 1
+        return True
+
+
+retry_budget = RetryBudget(
+    "retry_budget",
+    ratio=settings.RETRY_BUDGET_RATIO,
+    max_tokens=settings.RETRY_BUDGET_MAX_TOKENS,
+)
+
+metrics.register_gauge("retry_budget", lambda: round(retry_budget.tokens, 2))
+
+
+def error_headers(exc: BaseException) -> Optional[Mapping[str, str]]:
+    """Response headers carried by an upstream error, if any."""
+    if isinstance(exc, (httpx.HTTPStatusError, openai.APIStatusError)):
+        return exc.response.headers
+    if isinstance(exc, stripe.error.StripeError):
+        return exc.headers
+    return None
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code
+    if isinstance(exc, stripe.error.StripeError):
+        return exc.http_status
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """The delay an upstream asked for in ``Retry-After``, if any."""
+    headers = error_headers(exc)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Whether a failed call is worth repeating: timeouts, connection errors,
+    429s and 5xx responses. Deadline and circuit errors are not, since
+    neither changes by trying again.
+    """
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(exc, (openai.APIConnectionError, stripe.error.APIConnectionError)):
+        return True
+    status_code = _status_code(exc)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+class retry_upstream(retry_base):
+    """
+    Retry retryable errors while attempts remain and the retry budget
+    allows it. The attempt limit is checked here, before the budget, so
+    the final failure does not spend a token.
+    """
+
+    def __init__(self, name: str, max_attempts: int):
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        exc = retry_state.outcome.exception()
+        if exc is None or retry_state.attempt_number >= self.max_attempts:
+            return False
+        if not is_retryable(exc) or not retry_budget.withdraw():
+            return False
+        metrics.inc(f"upstream.{self.name}.retries")
+        return True
+
+
+class wait_upstream(wait_base):
+    """
+    Full-jitter exponential backoff, replaced by the upstream's own
+    ``Retry-After`` when it sends one, and never longer than what is left
+    of the request deadline.
+    """
+
+    def __init__(self, deadline: Optional[Deadline] = None):
+        self.deadline = deadline
+        self.backoff = wait_random_exponential(
+            multiplier=settings.RETRY_BACKOFF_BASE_SECONDS,
+            max=settings.RETRY_BACKOFF_MAX_SECONDS,
+        )
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        retry_after = retry_after_seconds(retry_state.outcome.exception())
+        if retry_after is not None:
+            wait = min(retry_after, settings.RETRY_AFTER_MAX_SECONDS)
+        else:
+            wait = self.backoff(retry_state)
+        if self.deadline is not None:
+            wait = min(wait, self.deadline.remaining())
+        return wait
+
+
+def retry_kwargs(name: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Keyword arguments for ``tenacity.AsyncRetrying`` under the shared policy."""
+    return {
+        "retry": retry_upstream(name, settings.RETRY_MAX_ATTEMPTS),
+        "wait": wait_upstream(deadline),
+        "reraise": True,
+    }
@@ -0,0 +1,95 @@
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.search import SearchResponse, SearchResult
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+MAX_TERMS = 8
+
+SQLITE_SEARCH = """
+    SELECT source, item_type, ref_id, parent_id, title, author,
+           -bm25(search_index, 0.0, 10.0, 5.0, 1.0) AS rank
+    FROM search_index
+    WHERE search_index MATCH :match {item_type_filter}
+    ORDER BY rank DESC
+    LIMIT :limit OFFSET :skip
+"""
+
+POSTGRES_SEARCH = """
+    SELECT source, item_type, ref_id, parent_id, title, author,
+           ts_rank_cd(document, query) AS rank
+    FROM search_documents, to_tsquery('simple', :tsquery) AS query
+    WHERE user_id = :user_id AND document @@ query {item_type_filter}
+    ORDER BY rank DESC
+    LIMIT :limit OFFSET :skip
+"""
+
+
+def _terms(query: str) -> List[str]:
+    """Split a user query into word tokens safe to embed in a match expression."""
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+class SearchService:
+    """Ranked full-text search over a user's saved items and recommendations."""
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: str,
+        query: str,
+        item_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> SearchResponse:
+        """Match every term as a prefix, best matches first."""
+        terms = _terms(query)
+        if not terms:
+            return SearchResponse(items=[], skip=skip, limit=limit, has_more=False)
+
+        params = {"skip": skip, "limit": limit + 1}
+        item_type_filter = ""
+        if item_type:
+            item_type_filter = "AND item_type = :item_type"
+            params["item_type"] = item_type
+
+        if db.get_bind().dialect.name == "sqlite":
+            owner = user_id.replace("-", "")
+            words = " ".join(f'"{term}"*' for term in terms)
+            params["match"] = f'owner:"{owner}" AND {{title author description}}:({words})'
+            statement = SQLITE_SEARCH
+        else:
+            params["tsquery"] = " & ".join(f"{term}:*" for term in terms)
+            params["user_id"] = user_id
+            statement = POSTGRES_SEARCH
+
+        result = await db.execute(
+            text(statement.format(item_type_filter=item_type_filter)), params
+        )
+        rows = result.mappings().all()
+
+        items = [
+            SearchResult(
+                source=row["source"],
+                item_type=row["item_type"],
+                id=row["ref_id"],
+                item_id=row["parent_id"] if row["source"] == "saved_item" else None,
+                recommendation_id=(
+                    row["parent_id"] if row["source"] == "recommendation" else None
+                ),
+                title=row["title"],
+                author=row["author"],
+                rank=row["rank"],
+            )
+            for row in rows[:limit]
+        ]
+        return SearchResponse(
+            items=items, skip=skip, limit=limit, has_more=len(rows) > limit
+        )
+
+
+search_service = SearchService()
@@ -2,7 +2,9 @@ import stripe
 from typing import Dict, Any, Optional
 from app.core.config import settings
 from app.models.subscription import Subscription
+from app.services.upstream import upstreams
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +12,10 @@ logger = logging.getLogger(__name__)
 class StripeService:
     def __init__(self):
         stripe.api_key = settings.STRIPE_SECRET_KEY
+        stripe.default_http_client = stripe.http_client.RequestsClient(
+            timeout=settings.STRIPE_TIMEOUT_SECONDS
+        )
+        self.upstream = upstreams["stripe"]
         self.webhook_secret = settings.STRIPE_WEBHOOK_SECRET
 
     async def create_customer(
@@ -17,7 +23,13 @@ class StripeService:
     ) -> Optional[str]:
         """Create a Stripe customer."""
         try:
-            customer = stripe.Customer.create(email=email, name=name)
+            # One key across retries so Stripe creates the customer only once
+            customer = await self.upstream.call_sync(
+                stripe.Customer.create,
+                email=email,
+                name=name,
+                idempotency_key=str(uuid.uuid4()),
+            )
             return customer.id
         except Exception as e:
             logger.error(f"Error creating Stripe customer: {e}")
@@ -28,12 +40,14 @@ class StripeService:
     ) -> Optional[Dict[str, Any]]:
         """Create a Stripe subscription."""
         try:
-            subscription = stripe.Subscription.create(
+            subscription = await self.upstream.call_sync(
+                stripe.Subscription.create,
                 customer=customer_id,
                 items=[{"price": price_id}],
                 payment_behavior="default_incomplete",
                 payment_settings={"save_default_payment_method": "on_subscription"},
                 expand=["latest_invoice.payment_intent"],
+                idempotency_key=str(uuid.uuid4()),
             )
             return {
                 "subscription_id": subscription.id,
@@ -47,7 +61,9 @@ class StripeService:
     async def cancel_subscription(self, subscription_id: str) -> bool:
         """Cancel a Stripe subscription."""
         try:
-            stripe.Subscription.modify(subscription_id, cancel_at_period_end=True)
+            await self.upstream.call_sync(
+                stripe.Subscription.modify, subscription_id, cancel_at_period_end=True
+            )
             return True
         except Exception as e:
             logger.error(f"Error canceling subscription: {e}")
@@ -56,7 +72,9 @@ class StripeService:
     async def get_subscription(self, subscription_id: str) -> Optional[Dict[str, Any]]:
         """Get subscription details from Stripe."""
         try:
-            subscription = stripe.Subscription.retrieve(subscription_id)
+            subscription = await self.upstream.call_sync(
+                stripe.Subscription.retrieve, subscription_id
+            )
             return {
                 "id": subscription.id,
                 "status": subscription.status,
@@ -0,0 +1,84 @@
+from typing import Dict, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.recommendation import recommendation_crud
+from app.crud.saved_item import saved_item_crud
+from app.crud.sync import user_change_crud
+from app.schemas.recommendation import RecommendationHistoryResponse
+from app.schemas.saved_item import SavedItemRef, SavedItemResponse
+from app.schemas.sync import RecommendationsDelta, SavedItemsDelta, SyncResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SyncService:
+    """Build delta responses from the user change log."""
+
+    async def get_changes(
+        self, db: AsyncSession, *, user_id: str, since: int, limit: int = 500
+    ) -> SyncResponse:
+        """
+        Collapse the user's changes after ``since`` to the latest operation
+        per entity and attach the current state of everything upserted.
+        """
+        changes = await user_change_crud.get_since(
+            db, user_id=user_id, since=since, limit=limit + 1
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if not changes:
+            version = await user_change_crud.current_version(db, user_id=user_id)
+            return SyncResponse(version=version, reset=since > version)
+
+        saved_upserts, saved_deletes = set(), set()
+        recommendation_upserts, recommendation_deletes = set(), set()
+        latest: Dict[Tuple[str, str], str] = {}
+        for change in changes:
+            latest[(change.entity, change.entity_id)] = change.op
+        for (entity, entity_id), op in latest.items():
+            if entity == "saved_item":
+                ref = tuple(entity_id.split(":", 1))
+                (saved_upserts if op == "upsert" else saved_deletes).add(ref)
+            elif entity == "recommendation":
+                (recommendation_upserts if op == "upsert" else recommendation_deletes).add(entity_id)
+
+        saved_items = await saved_item_crud.get_by_refs(
+            db, user_id=user_id, refs=list(saved_upserts)
+        )
+        recommendations = await recommendation_crud.get_multi_by_ids(
+            db, user_id=user_id, ids=list(recommendation_upserts)
+        )
+
+        # Entities upserted in this page but gone since were deleted by a
+        # change on a later page; report them as deleted now
+        saved_deletes |= saved_upserts - {
+            (item.item_type, item.item_id) for item in saved_items
+        }
+        recommendation_deletes |= recommendation_upserts - {
+            rec.id for rec in recommendations
+        }
+
+        return SyncResponse(
+            version=changes[-1].version,
+            has_more=has_more,
+            saved_items=SavedItemsDelta(
+                upserted=[SavedItemResponse.model_validate(item) for item in saved_items],
+                deleted=[
+                    SavedItemRef(item_type=item_type, item_id=item_id)
+                    for item_type, item_id in sorted(saved_deletes)
+                ],
+            ),
+            recommendations=RecommendationsDelta(
+                upserted=[
+                    RecommendationHistoryResponse(
+                        id=rec.id, title=rec.history_title, created_at=rec.created_at
+                    )
+                    for rec in recommendations
+                ],
+                deleted=sorted(recommendation_deletes),
+            ),
+        )
+
+
+sync_service = SyncService()
@@ -1,7 +1,12 @@
-import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.concurrency import BulkheadFull
+from app.services.upstream import upstreams
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -11,90 +16,161 @@ class TMDBService:
         self.api_key = settings.TMDB_API_KEY
         self.base_url = "https://api.themoviedb.org/3"
         self.image_base_url = "https://image.tmdb.org/t/p/w500"
+        self._genre_names: Dict[int, str] = {}
+        self._genres_expire_at = 0.0
+        self._genres_lock: Optional[asyncio.Lock] = None
+        self.upstream = upstreams["tmdb"]
+
+    async def _get(
+        self, path: str, params: Dict[str, Any], deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """GET a TMDB endpoint through the upstream's timeout and circuit breaker."""
+
+        async def request():
+            response = await self.upstream.http_client.get(
+                f"{self.base_url}{path}", params={"api_key": self.api_key, **params}
+            )
+            response.raise_for_status()
+            self.upstream.limiter.update(response.headers)
+            return response.json()
+
+        return await self.upstream.call(
+            request, deadline=deadline, hedge=settings.HEDGE_ENABLED
+        )
+
+    async def get_genre_names(self) -> Dict[int, str]:
+        """
+        Map of TMDB movie genre IDs to names, fetched once and refreshed
+        after TMDB_GENRE_CACHE_TTL_SECONDS. A failed refresh keeps serving
+        the previous map and retries a minute later.
+        """
+        if time.monotonic() < self._genres_expire_at or not self.api_key:
+            return self._genre_names
+
+        if self._genres_lock is None:
+            self._genres_lock = asyncio.Lock()
+
+        async with self._genres_lock:
+            # Another request may have refreshed the map while we waited
+            if time.monotonic() < self._genres_expire_at:
+                return self._genre_names
+
+            try:
+                data = await self._get("/genre/movie/list", {})
+                self._genre_names = {
+                    genre["id"]: genre["name"] for genre in data.get("genres", [])
+                }
+                self._genres_expire_at = (
+                    time.monotonic() + settings.TMDB_GENRE_CACHE_TTL_SECONDS
+                )
+            except Exception as e:
+                logger.error(f"Error loading TMDB genre list: {e}")
+                self._genres_expire_at = time.monotonic() + 60
+
+        return self._genre_names
+
+    async def genre_names_for(self, genre_ids: List[int]) -> List[str]:
+        """Resolve a search result's ``genre_ids`` to genre names."""
+        genre_names = await self.get_genre_names()
+        return [genre_names[genre_id] for genre_id in genre_ids if genre_id in genre_names]
 
     async def search_movie(
-        self, title: str, year: Optional[int] = None
+        self,
+        title: str,
+        year: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
     ) -> Optional[Dict[str, Any]]:
         """Search for a movie by title."""
         if not self.api_key:
             return None
 
-        params = {"api_key": self.api_key, "query": title}
+        params = {"query": title}
 
         if year:
             params["year"] = year
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/search/movie", params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                if data["results"]:
-                    return data["results"][0]  # Return first match
-
+            data = await self._get("/search/movie", params, deadline)
+            if data["results"]:
+                return data["results"][0]  # Return first match
+
+        except (CircuitOpenError, BulkheadFull):
+            logger.debug(f"TMDB unavailable, skipping search for {title}")
+        except DeadlineExceeded:
+            logger.debug(f"Out of time, skipping TMDB search for {title}")
         except Exception as e:
             logger.error(f"Error searching TMDB for {title}: {e}")
 
         return None
 
-    async def get_movie_details(self, movie_id: int) -> Optional[Dict[str, Any]]:
+    async def get_movie_details(
+        self, movie_id: int, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict[str, Any]]:
         """Get detailed movie information."""
         if not self.api_key:
             return None
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/movie/{movie_id}",
-                    params={"api_key": self.api_key},
-                )
-                response.raise_for_status()
-                return response.json()
+            return await self._get(f"/movie/{movie_id}", {}, deadline)
 
+        except (CircuitOpenError, BulkheadFull):
+            logger.debug(f"TMDB unavailable, skipping details for ID {movie_id}")
+        except DeadlineExceeded:
+            logger.debug(f"Out of time, skipping TMDB details for ID {movie_id}")
         except Exception as e:
             logger.error(f"Error getting movie details for ID {movie_id}: {e}")
 
         return None
 
-    async def enrich_movie_data(self, movie_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def enrich_movie_data(
+        self, movie_data: Dict[str, Any], deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """Enrich AI-generated movie data with TMDB information."""
         title = movie_data.get("title", "")
         year = movie_data.get("year")
 
         # Search for the movie
-        tmdb_movie = await self.search_movie(title, year)
+        tmdb_movie = await self.search_movie(title, year, deadline)
 
         if not tmdb_movie:
             return movie_data
 
-        # Get detailed information
-        movie_details = await self.get_movie_details(tmdb_movie["id"])
-
         enriched_data = movie_data.copy()
-
-        if movie_details:
-            enriched_data.update(
-                {
-                    "tmdb_id": str(movie_details["id"]),
-                    "poster_path": (
-                        f"{self.image_base_url}{movie_details['poster_path']}"
-                        if movie_details.get("poster_path")
-                        else None
-                    ),
-                    "release_date": movie_details.get("release_date"),
-                    "runtime": movie_details.get("runtime"),
-                    "rating": movie_details.get("vote_average"),
-                }
-            )
-
-            # Use TMDB description if AI description is short
-            if len(movie_data.get("description", "")) < 100 and movie_details.get(
-                "overview"
-            ):
-                enriched_data["description"] = movie_details["overview"]
+        enriched_data.update(
+            {
+                "tmdb_id": str(tmdb_movie["id"]),
+                "poster_path": (
+                    f"{self.image_base_url}{tmdb_movie['poster_path']}"
+                    if tmdb_movie.get("poster_path")
+                    else None
+                ),
+                "release_date": tmdb_movie.get("release_date"),
+                "rating": tmdb_movie.get("vote_average"),
+            }
+        )
+
+        # Genres are TMDB's own once matched, so callers can tell them apart
+        # from the model's
+        genres = await self.genre_names_for(tmdb_movie.get("genre_ids", []))
+        if genres:
+            enriched_data["genres"] = genres
+        else:
+            enriched_data.pop("genres", None)
+
+        # The search result has everything but runtime; only fetch details
+        # for it when configured to and the request can spare the time
+        if settings.TMDB_ENRICHMENT_MODE != "search_only" and (
+            deadline is None or deadline.has(settings.ENRICHMENT_MIN_BUDGET_SECONDS)
+        ):
+            movie_details = await self.get_movie_details(tmdb_movie["id"], deadline)
+            if movie_details:
+                enriched_data["runtime"] = movie_details.get("runtime")
+
+        # Use TMDB description if AI description is short
+        if len(movie_data.get("description", "")) < 100 and tmdb_movie.get(
+            "overview"
+        ):
+            enriched_data["description"] = tmdb_movie["overview"]
 
         return enriched_data
 
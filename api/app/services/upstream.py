@@ -0,0 +1,359 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.core.metrics import metrics
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.concurrency import AdaptiveLimiter, BulkheadFull
+from app.services.rate_limit import RateLimiter
+from app.services.retry import (
+    RetryBudget,
+    error_headers,
+    retry_after_seconds,
+    retry_budget,
+    retry_kwargs,
+)
+from tenacity import AsyncRetrying
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import copy
+import functools
+import httpx
+import openai
+import stripe
+import time
+
+T = TypeVar("T")
+
+# Hedged requests are duplicates of a slow call, so they are capped the same
+# way retries are: at a fraction of hedged calls, process-wide
+hedge_budget = RetryBudget(
+    "hedge_budget",
+    ratio=settings.HEDGE_BUDGET_RATIO,
+    max_tokens=settings.HEDGE_BUDGET_MAX_TOKENS,
+)
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Whether an exception means the upstream itself is unhealthy, as opposed
+    to rejecting this particular request (404s, card declines, bad input).
+    """
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    if isinstance(
+        exc,
+        (openai.APIConnectionError, openai.InternalServerError),
+    ):
+        return True
+    if isinstance(exc, (stripe.error.APIConnectionError, stripe.error.APIError)):
+        return True
+    return False
+
+
+class Upstream:
+    """
+    A remote dependency. Every call to it goes through ``call``, which
+    retries it under the shared retry policy and bounds each attempt with
+    a timeout and a circuit breaker. Idempotent calls can also be hedged.
+
+    Attempts are paced by a rate limiter and bounded by an adaptive
+    concurrency limit. Callers whose requests return rate-limit headers
+    pass them to ``limiter.update``; error responses are fed to it here.
+
+    Each upstream is a bulkhead: at most ``max_concurrency`` calls run at
+    once over its own connection pool (``http_client``) or worker threads
+    (``call_sync``), and once ``max_queue`` callers are waiting further
+    calls fail fast with BulkheadFull, so a slow dependency cannot tie up
+    the resources the others need.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        timeout: float,
+        max_concurrency: int,
+        max_queue: int,
+        rate_limit: float = 0.0,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.limiter = RateLimiter(name, rate=rate_limit)
+        self.concurrency = AdaptiveLimiter(
+            name,
+            initial_limit=min(settings.ADAPTIVE_CONCURRENCY_INITIAL, max_concurrency),
+            min_limit=min(settings.ADAPTIVE_CONCURRENCY_MIN, max_concurrency),
+            max_limit=max_concurrency,
+            latency_tolerance=settings.ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE,
+            backoff_ratio=settings.ADAPTIVE_CONCURRENCY_BACKOFF_RATIO,
+            max_queue=max_queue,
+        )
+        self.breaker = self._circuit_breaker(name)
+        self.partitions: Dict[str, "Upstream"] = {}
+        self._latencies: Deque[float] = deque(maxlen=settings.HEDGE_LATENCY_WINDOW)
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _circuit_breaker(self, name: str) -> CircuitBreaker:
+        return CircuitBreaker(
+            name,
+            slow_call_seconds=self.timeout * settings.CIRCUIT_SLOW_CALL_RATIO,
+            window_size=settings.CIRCUIT_WINDOW_SIZE,
+            min_calls=settings.CIRCUIT_MIN_CALLS,
+            failure_rate_threshold=settings.CIRCUIT_FAILURE_RATE_THRESHOLD,
+            slow_call_rate_threshold=settings.CIRCUIT_SLOW_CALL_RATE_THRESHOLD,
+            open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Connection pool reserved for this upstream, sized to its bulkhead."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._http_client
+
+    def partition(self, key: str) -> "Upstream":
+        """
+        The part of this upstream serving ``key`` (an OpenAI model, say),
+        for endpoints that fail independently. It has its own circuit
+        breaker and latency history but shares the rate limiter,
+        concurrency limit, queue and connection pool, so the upstream's
+        caps hold across all its partitions. Created on first use.
+        """
+        name = f"{self.name}:{key}"
+        if name not in self.partitions:
+            self.http_client  # Create the pool first so the partition shares it
+            partition = copy.copy(self)
+            partition.name = name
+            partition.breaker = self._circuit_breaker(name)
+            partition.partitions = {}
+            partition._latencies = deque(maxlen=settings.HEDGE_LATENCY_WINDOW)
+            self.partitions[name] = partition
+        return self.partitions[name]
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit is open, so optional calls can be skipped."""
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        How long to wait before hedging: the HEDGE_PERCENTILE of recent
+        successful call latencies, or None until enough have been seen.
+        """
+        if len(self._latencies) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        latencies = sorted(self._latencies)
+        index = int(len(latencies) * settings.HEDGE_PERCENTILE / 100)
+        return latencies[min(index, len(latencies) - 1)]
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        deadline: Optional[Deadline] = None,
+        retry: bool = True,
+        hedge: bool = False,
+    ) -> T:
+        """
+        Await ``fn()``, retrying timeouts, connection errors, 429s and 5xxs
+        with jittered backoff (or the upstream's ``Retry-After``) while the
+        process-wide retry budget allows. Pass ``retry=False`` for calls
+        that are not safe to repeat, and ``hedge=True`` for idempotent
+        calls worth racing against a duplicate when slow.
+
+        Each attempt fails fast with CircuitOpenError while the circuit is
+        open and is bounded by the upstream's timeout, or by what is left
+        of ``deadline`` if that is shorter; running out of deadline raises
+        DeadlineExceeded and does not count against the upstream.
+        """
+        retry_budget.deposit()
+        attempt = self._attempt
+        if hedge:
+            hedge_budget.deposit()
+            attempt = self._hedged_attempt
+        if not retry:
+            return await attempt(fn, deadline)
+        retrying = AsyncRetrying(**retry_kwargs(self.name, deadline))
+        return await retrying(attempt, fn, deadline)
+
+    async def _hedged_attempt(
+        self, fn: Callable[[], Awaitable[T]], deadline: Optional[Deadline]
+    ) -> T:
+        """
+        Run an attempt and, if it has not finished within ``hedge_delay``,
+        race a duplicate against it. The first success wins and the other
+        is cancelled; if both fail, the first attempt's error is raised.
+        """
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._attempt(fn, deadline)
+
+        primary = asyncio.ensure_future(self._attempt(fn, deadline))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if (
+                done
+                or not self.available
+                or self.limiter.queue_depth
+                or self.concurrency.inflight >= self.concurrency.limit
+                or not hedge_budget.withdraw()
+            ):
+                return await primary
+
+            metrics.inc(f"upstream.{self.name}.hedges")
+            hedged = asyncio.ensure_future(self._attempt(fn, deadline))
+            pending.add(hedged)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            metrics.inc(f"upstream.{self.name}.hedge_wins")
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(
+        self, fn: Callable[[], Awaitable[T]], deadline: Optional[Deadline]
+    ) -> T:
+        if self.limiter.queue_depth >= self.max_queue:
+            metrics.inc(f"bulkhead.{self.name}.rejected")
+            raise BulkheadFull(self.name)
+        await self.limiter.acquire(deadline)
+        await self.concurrency.acquire(deadline)
+        try:
+            return await self._run(fn, deadline)
+        finally:
+            self.concurrency.release()
+
+    async def _run(
+        self, fn: Callable[[], Awaitable[T]], deadline: Optional[Deadline]
+    ) -> T:
+        timeout = deadline.timeout(self.timeout) if deadline else self.timeout
+        clipped = timeout < self.timeout
+
+        self.breaker.before_call()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(fn(), timeout)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            if clipped:
+                self.breaker.release()
+                metrics.inc(f"upstream.{self.name}.deadline_exceeded")
+                raise DeadlineExceeded(f"Deadline exceeded calling {self.name}")
+            self._record(True, time.perf_counter() - start)
+            raise
+        except Exception as e:
+            headers = error_headers(e)
+            if headers is not None:
+                self.limiter.update(headers, retry_after_seconds(e))
+            failed = is_upstream_failure(e)
+            self._record(failed, time.perf_counter() - start)
+            raise
+        duration = time.perf_counter() - start
+        self._record(False, duration)
+        self._latencies.append(duration)
+        return result
+
+    async def call_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking SDK call through ``call`` on this upstream's own
+        worker threads. Calls that create resources must carry an
+        idempotency key to be retried.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix=self.name
+            )
+        return await self.call(
+            lambda: asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        )
+
+    def _record(self, failed: bool, duration: float) -> None:
+        self.breaker.record(failed, duration)
+        self.concurrency.record(failed, duration)
+        metrics.observe(f"upstream.{self.name}.latency_seconds", duration)
+        if failed:
+            metrics.inc(f"upstream.{self.name}.failures")
+
+
+upstreams: Dict[str, Upstream] = {
+    "openai": Upstream(
+        "openai",
+        timeout=settings.OPENAI_TIMEOUT_SECONDS * (1 + settings.OPENAI_MAX_RETRIES),
+        max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+        max_queue=settings.OPENAI_MAX_QUEUE,
+        rate_limit=settings.OPENAI_RATE_LIMIT_PER_SECOND,
+    ),
+    "tmdb": Upstream(
+        "tmdb",
+        timeout=settings.TMDB_TIMEOUT_SECONDS,
+        max_concurrency=settings.TMDB_MAX_CONCURRENCY,
+        max_queue=settings.TMDB_MAX_QUEUE,
+        rate_limit=settings.TMDB_RATE_LIMIT_PER_SECOND,
+    ),
+    "books": Upstream(
+        "books",
+        timeout=settings.GOOGLE_BOOKS_TIMEOUT_SECONDS,
+        max_concurrency=settings.GOOGLE_BOOKS_MAX_CONCURRENCY,
+        max_queue=settings.GOOGLE_BOOKS_MAX_QUEUE,
+        rate_limit=settings.GOOGLE_BOOKS_RATE_LIMIT_PER_SECOND,
+    ),
+    "stripe": Upstream(
+        "stripe",
+        timeout=settings.STRIPE_TIMEOUT_SECONDS,
+        max_concurrency=settings.STRIPE_MAX_CONCURRENCY,
+        max_queue=settings.STRIPE_MAX_QUEUE,
+        rate_limit=settings.STRIPE_RATE_LIMIT_PER_SECOND,
+    ),
+}
+
+metrics.register_gauge(
+    "rate_limit_queue_depth",
+    lambda: {name: upstream.limiter.queue_depth for name, upstream in upstreams.items()},
+)
+
+metrics.register_gauge(
+    "upstream_concurrency",
+    lambda: {
+        name: {
+            "limit": upstream.concurrency.limit,
+            "inflight": upstream.concurrency.inflight,
+            "queued": upstream.concurrency.queue_depth,
+        }
+        for name, upstream in upstreams.items()
+    },
+)
+
+metrics.register_gauge("hedge_budget", lambda: round(hedge_budget.tokens, 2))
+
+metrics.register_gauge(
+    "circuit_breakers",
+    lambda: {
+        partition.name: partition.breaker.state
+        for upstream in upstreams.values()
+        for partition in (upstream, *upstream.partitions.values())
+    },
+)
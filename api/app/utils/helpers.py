@@ -0,0 +1,43 @@
+from typing import Any, Dict, Iterable, Optional
+from datetime import datetime
+import json
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def splice_json(fields: Dict[str, Any], raw_fields: Dict[str, Optional[str]]) -> str:
+    """
+    Serialize ``fields`` as a JSON object and append ``raw_fields`` verbatim.
+
+    Values in ``raw_fields`` must already be JSON documents (for example a
+    JSON column read back as text); they are inserted without being parsed
+    and re-encoded. ``None`` is written as ``null``.
+    """
+    encoded = json.dumps(fields, default=_default, separators=(",", ":"))
+    members = ",".join(
+        f"{json.dumps(name)}:{raw if raw is not None else 'null'}"
+        for name, raw in raw_fields.items()
+    )
+    if not members:
+        return encoded
+    if encoded == "{}":
+        return "{" + members + "}"
+    return encoded[:-1] + "," + members + "}"
+
+
+def prepend_json_member(raw_object: str, name: str, value: Any) -> str:
+    """Insert a member at the start of an already-encoded JSON object."""
+    member = f"{json.dumps(name)}:{json.dumps(value, default=_default)}"
+    body = raw_object.strip()[1:].lstrip()
+    if body.startswith("}"):
+        return "{" + member + "}"
+    return "{" + member + "," + body
+
+
+def json_array(encoded_items: Iterable[str]) -> str:
+    """Join already-encoded JSON values into a JSON array."""
+    return "[" + ",".join(encoded_items) + "]"
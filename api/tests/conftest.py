@@ -0,0 +1,52 @@
+import os
+import tempfile
+import uuid
+
+# Settings are read once at import, so point the app at a scratch database
+# with a small pool before anything imports it
+_db_dir = tempfile.mkdtemp(prefix="smartadvisor-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_dir}/test.db")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("DB_POOL_SIZE", "5")
+os.environ.setdefault("DB_MAX_OVERFLOW", "0")
+os.environ.setdefault("DB_POOL_TIMEOUT", "5")
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.main import app
+
+
+@pytest.fixture(params=[False, True], ids=["inline", "write_queue"])
+def write_queue_enabled(request, monkeypatch):
+    """Run a test with writes committed inline and through the write queue."""
+    monkeypatch.setattr(settings, "SQLITE_WRITE_QUEUE_ENABLED", request.param)
+    return request.param
+
+
+@pytest_asyncio.fixture
+async def client(write_queue_enabled):
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+
+@pytest_asyncio.fixture
+async def user(client):
+    """A registered user: their ID and auth headers."""
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": f"{uuid.uuid4().hex}@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    me = await client.get("/api/v1/users/me", headers=headers)
+    return {"id": me.json()["id"], "headers": headers}
+
+
+@pytest_asyncio.fixture
+async def db(client):
+    async with AsyncSessionLocal() as session:
+        yield session
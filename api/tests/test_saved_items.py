@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.crud.counter import SAVED_ITEMS, SYNC_VERSION, user_counter_crud
+from app.crud.saved_item import saved_item_crud
+from app.models.saved_item import SavedItem
+from app.models.sync import UserChange
+from app.schemas.saved_item import SavedItemCreate
+from app.services.books_service import books_service
+from app.services.tmdb_service import tmdb_service
+
+SAVED_ITEMS_URL = "/api/v1/users/saved-items"
+
+
+def movie(item_id, title, year):
+    return SavedItemCreate(
+        item_id=item_id,
+        item_type="movie",
+        item_title=title,
+        item_data={"title": title, "year": year},
+    )
+
+
+async def save(client, user, item, status_code=200):
+    response = await client.post(
+        SAVED_ITEMS_URL, headers=user["headers"], json=item.model_dump()
+    )
+    assert response.status_code == status_code
+
+
+async def saved_item_ids(db, user_id):
+    result = await db.execute(
+        select(SavedItem.item_id).where(SavedItem.user_id == user_id)
+    )
+    return set(result.scalars())
+
+
+@pytest.mark.asyncio
+async def test_create_many_skips_titles_already_saved(client, db, user):
+    await save(client, user, movie("m1", "Heat", 1995))
+
+    imported = await saved_item_crud.create_many_for_user(
+        db,
+        user_id=user["id"],
+        items=[
+            # Same catalog title as m1 under another ID
+            movie("import:heat", "Heat", 1995),
+            # Same item ID twice, and the same title twice within the batch
+            movie("m2", "Up", 2009),
+            movie("m2", "Up", 2009),
+            movie("import:up", "up ", 2009),
+            movie("m3", "Heat", 1986),
+        ],
+    )
+    await db.commit()
+
+    assert imported == 2
+    assert await saved_item_ids(db, user["id"]) == {"m1", "m2", "m3"}
+    assert await user_counter_crud.get_value(db, user_id=user["id"], name=SAVED_ITEMS) == 3
+
+
+async def assert_counters_match_rows(db, user_id):
+    saved = await saved_item_ids(db, user_id)
+    assert await user_counter_crud.get_value(db, user_id=user_id, name=SAVED_ITEMS) == len(saved)
+
+    versions = await db.execute(
+        select(UserChange.version)
+        .where(UserChange.user_id == user_id)
+        .order_by(UserChange.version)
+    )
+    versions = list(versions.scalars())
+    assert versions == list(range(1, len(versions) + 1))
+    assert await user_counter_crud.get_value(db, user_id=user_id, name=SYNC_VERSION) == len(versions)
+    return len(versions)
+
+
+@pytest.mark.asyncio
+async def test_counters_and_sync_version_after_save_unsave_and_import(
+    client, db, user, monkeypatch
+):
+    async def no_match(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(tmdb_service, "search_movie", no_match)
+    monkeypatch.setattr(books_service, "search_book", no_match)
+
+    await save(client, user, movie("m1", "Heat", 1995))
+    await save(client, user, movie("m2", "Up", 2009))
+    # Saving again is rejected and changes nothing
+    await save(client, user, movie("m2", "Up", 2009), status_code=400)
+    assert await assert_counters_match_rows(db, user["id"]) == 2
+
+    response = await client.delete(
+        f"{SAVED_ITEMS_URL}/m1", headers=user["headers"], params={"item_type": "movie"}
+    )
+    assert response.status_code == 200
+    assert await assert_counters_match_rows(db, user["id"]) == 3
+
+    rows = [{"title": "Up", "year": 2009}, {"title": "Alien", "year": 1979}]
+    response = await client.post(
+        f"{SAVED_ITEMS_URL}/import",
+        headers=user["headers"],
+        files={"file": ("items.jsonl", "\n".join(json.dumps(row) for row in rows))},
+    )
+    summary = json.loads(response.text.splitlines()[-1])
+    assert (summary["imported"], summary["duplicates"]) == (1, 1)
+    assert await assert_counters_match_rows(db, user["id"]) == 4
+
+    response = await client.get("/api/v1/users/sync", headers=user["headers"])
+    assert response.json()["version"] == 4
@@ -0,0 +1,75 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import AsyncSessionLocal, WriteSessionLocal
+from app.core.write_queue import WriteQueue
+from app.models.recommendation import Genre
+
+
+@pytest.mark.asyncio
+async def test_failed_job_does_not_fail_its_group_commit(client):
+    sessions = []
+
+    def writer_session():
+        sessions.append(None)
+        return WriteSessionLocal()
+
+    queue = WriteQueue(AsyncSessionLocal, writer_session)
+    names = [f"genre-{uuid.uuid4().hex}" for _ in range(3)]
+    async with AsyncSessionLocal() as session:
+        session.add(Genre(name=names[1]))
+        await session.commit()
+
+    async def add_genre(session, name):
+        session.add(Genre(name=name))
+        await session.flush()
+        return name
+
+    queue.start()
+    try:
+        results = await asyncio.gather(
+            *(queue.submit(lambda s, name=name: add_genre(s, name)) for name in names),
+            return_exceptions=True,
+        )
+    finally:
+        await queue.stop()
+
+    assert results[0] == names[0]
+    assert isinstance(results[1], IntegrityError)
+    assert results[2] == names[2]
+    # One group commit, then each job retried on its own
+    assert len(sessions) == 4
+
+    async with AsyncSessionLocal() as session:
+        saved = await session.execute(select(Genre.name).where(Genre.name.in_(names)))
+        assert set(saved.scalars()) == set(names)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("write_queue_enabled", [True], indirect=True)
+async def test_concurrent_saves_above_pool_size(client, user):
+    # Each request holds a pooled connection while its write is queued
+    async def save(index):
+        response = await client.post(
+            "/api/v1/users/saved-items",
+            headers=user["headers"],
+            json={
+                "item_id": f"m{index}",
+                "item_type": "movie",
+                "item_title": f"Movie {index}",
+                "item_data": {"title": f"Movie {index}"},
+            },
+        )
+        return response.status_code
+
+    statuses = await asyncio.gather(*(save(index) for index in range(40)))
+
+    assert statuses == [200] * 40
+    response = await client.get(
+        "/api/v1/users/saved-items", headers=user["headers"], params={"limit": 100}
+    )
+    assert response.json()["total"] == 40